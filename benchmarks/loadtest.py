@@ -0,0 +1,235 @@
+"""Load-test every tool on the FastAPI backend or the FastMCP server.
+
+Each tool is driven in turn by ``--concurrency`` workers for ``--duration``
+seconds (or all tools interleaved with ``--mixed``). Per tool it reports
+throughput, latency percentiles and error rate, and optionally writes them
+as JSON that can be diffed against a previous run with ``--baseline``.
+
+Examples:
+    python benchmarks/loadtest.py fastapi --url http://localhost:8000 -c 32 -d 10 -o fastapi.json
+    python benchmarks/loadtest.py mcp --url http://localhost:8000/mcp -c 32 -d 10 -o mcp.json
+    python benchmarks/loadtest.py mcp -o new.json --baseline old.json
+
+Run ``benchmarks/stub_upstreams.py`` and point the servers' TAVILY_API_URL /
+WIKIPEDIA_API_URL at it to exercise web_search and wikipedia_summary offline.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import time
+from datetime import datetime, timezone
+
+# Representative arguments per tool. Free-text queries get a counter suffix
+# with --unique-queries so result caches don't turn the run into a cache benchmark.
+TOOL_ARGS = {
+    "add": {"a": 2, "b": 3},
+    "greet": {"name": "Ada"},
+    "reverse_string": {"s": "hello world"},
+    "word_count": {"s": "the quick brown fox jumps over the lazy dog"},
+    "reverse_string_batch": {"items": ["hello world"] * 100},
+    "word_count_batch": {"text": "\n".join(["the quick brown fox jumps over the lazy dog"] * 100)},
+    "wikipedia_summary": {"query": "Python programming language"},
+    "wikipedia_summary_batch": {"queries": ["Alan Turing", "Ada Lovelace", "Grace Hopper"]},
+    "web_search": {"query": "latest AI news"},
+    "python_exec": {"code": "sum(range(100))"},
+    "tool1": {"question": "ping"},
+    "tool2": {"question": "ping"},
+}
+UNIQUE_ARGS = {"wikipedia_summary": "query", "web_search": "query"}
+
+
+def make_args(tool: str, counter, unique: bool) -> dict:
+    args = dict(TOOL_ARGS[tool])
+    if unique and tool in UNIQUE_ARGS:
+        args[UNIQUE_ARGS[tool]] += f" {next(counter)}"
+    return args
+
+
+class FastAPIDriver:
+    def __init__(self, url: str, concurrency: int):
+        import httpx
+        self._client = httpx.AsyncClient(
+            base_url=url, timeout=60, limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def worker_session(self):
+        return self._client
+
+    async def call(self, session, tool: str, args: dict) -> bool:
+        response = await session.post(f"/tools/{tool}", json=args)
+        if response.status_code != 200:
+            return False
+        answer = response.json().get("answer")
+        return not (isinstance(answer, str) and answer.startswith("Error:"))
+
+    async def close_session(self, session):
+        pass
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class MCPDriver:
+    """One MCP session per worker, as concurrent agents would hold."""
+
+    def __init__(self, url: str, concurrency: int):
+        self.url = url
+
+    async def worker_session(self):
+        from fastmcp import Client
+        client = Client(self.url)
+        await client.__aenter__()
+        return client
+
+    async def call(self, session, tool: str, args: dict) -> bool:
+        result = await session.call_tool(f"{tool}_tool", args, raise_on_error=False)
+        if getattr(result, "is_error", False):
+            return False
+        content = getattr(result, "content", result)
+        text = getattr(content[0], "text", "") if content else ""
+        return not text.startswith("Error:")
+
+    async def close_session(self, session):
+        await session.__aexit__(None, None, None)
+
+    async def close(self):
+        pass
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    requests = len(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": ms(sum(latencies) / requests) if requests else 0.0,
+            "p50": ms(percentile(latencies, 0.50)),
+            "p90": ms(percentile(latencies, 0.90)),
+            "p95": ms(percentile(latencies, 0.95)),
+            "p99": ms(percentile(latencies, 0.99)),
+            "max": ms(latencies[-1]) if latencies else 0.0,
+        },
+    }
+
+
+async def drive(driver, tools: list, concurrency: int, duration: float, warmup: float, unique: bool) -> dict:
+    """Run ``concurrency`` workers cycling through ``tools``; return per-tool samples."""
+    samples = {tool: ([], [0]) for tool in tools}
+    counter = itertools.count()
+    sessions = await asyncio.gather(*(driver.worker_session() for _ in range(concurrency)))
+    start = time.perf_counter()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+
+    async def worker(session, offset: int):
+        cycle = itertools.islice(itertools.cycle(tools), offset % len(tools), None)
+        for tool in cycle:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            try:
+                ok = await driver.call(session, tool, make_args(tool, counter, unique))
+            except Exception:
+                ok = False
+            end = time.perf_counter()
+            if now >= measure_from:
+                latencies, errors = samples[tool]
+                latencies.append(end - now)
+                if not ok:
+                    errors[0] += 1
+
+    try:
+        await asyncio.gather(*(worker(session, i) for i, session in enumerate(sessions)))
+    finally:
+        await asyncio.gather(*(driver.close_session(s) for s in sessions), return_exceptions=True)
+    elapsed = time.perf_counter() - measure_from
+    return {tool: summarize(latencies, errors[0], elapsed) for tool, (latencies, errors) in samples.items()}
+
+
+async def run(args) -> dict:
+    driver = (FastAPIDriver if args.target == "fastapi" else MCPDriver)(args.url, args.concurrency)
+    results = {}
+    try:
+        if args.mixed:
+            results = await drive(driver, args.tools, args.concurrency, args.duration, args.warmup, args.unique_queries)
+        else:
+            for tool in args.tools:
+                results.update(await drive(driver, [tool], args.concurrency, args.duration, args.warmup, args.unique_queries))
+    finally:
+        await driver.close()
+    return {
+        "meta": {
+            "target": args.target,
+            "url": args.url,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "mixed": args.mixed,
+            "unique_queries": args.unique_queries,
+            "python": platform.python_version(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def print_report(report: dict, baseline: dict = None):
+    header = f"{'tool':<22}{'req':>8}{'rps':>10}{'err%':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for tool, r in report["results"].items():
+        lat = r["latency_ms"]
+        print(f"{tool:<22}{r['requests']:>8}{r['throughput_rps']:>10}{r['error_rate'] * 100:>7.1f}"
+              f"{lat['p50']:>10}{lat['p95']:>10}{lat['p99']:>10}{lat['max']:>10}")
+        old = (baseline or {}).get("results", {}).get(tool)
+        if old:
+            delta = lambda new, prev: f"{(new - prev) / prev * 100:+.1f}%" if prev else "n/a"
+            print(f"{'  vs baseline':<22}{'':>8}{delta(r['throughput_rps'], old['throughput_rps']):>10}{'':>7}"
+                  f"{delta(lat['p50'], old['latency_ms']['p50']):>10}{delta(lat['p95'], old['latency_ms']['p95']):>10}"
+                  f"{delta(lat['p99'], old['latency_ms']['p99']):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("target", choices=["fastapi", "mcp"])
+    parser.add_argument("--url", help="server URL (default http://localhost:8000, plus /mcp for the MCP target)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="measured seconds per tool")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before each phase")
+    parser.add_argument("--tools", default=",".join(TOOL_ARGS), help="comma-separated tools to drive")
+    parser.add_argument("--mixed", action="store_true", help="interleave all tools in a single phase")
+    parser.add_argument("--unique-queries", action="store_true", help="defeat result caches for lookup tools")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="previous JSON results to compare against")
+    args = parser.parse_args()
+    args.url = args.url or ("http://localhost:8000" if args.target == "fastapi" else "http://localhost:8000/mcp")
+    args.tools = [t.strip() for t in args.tools.split(",") if t.strip()]
+    unknown = set(args.tools) - set(TOOL_ARGS)
+    if unknown:
+        parser.error(f"no sample arguments for: {', '.join(sorted(unknown))}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report = asyncio.run(run(args))
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Local stand-ins for the Tavily and Wikipedia (MediaWiki) APIs.
+
+Lets the backends be load-tested without network access, API keys or
+upstream rate limits. Point the backends at it with:
+
+    TAVILY_API_URL=http://127.0.0.1:8900
+    WIKIPEDIA_API_URL=http://127.0.0.1:8900/w/api.php
+
+Usage:
+    python benchmarks/stub_upstreams.py --port 8900 --latency-ms 50
+    python benchmarks/stub_upstreams.py --error-rate 0.2   # exercise retries / circuit breaking
+"""
+import argparse
+import json
+import random
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+LOREM = (
+    "{title} is a topic frequently looked up by agents. It has a long history. "
+    "Researchers have written about {title} extensively. It remains relevant today."
+)
+
+
+def _pageid(title: str) -> str:
+    return str(zlib.crc32(title.encode()) % 10_000_000)
+
+
+def tavily_search(body: dict) -> dict:
+    query = body.get("query", "")
+    return {
+        "query": query,
+        "results": [
+            {
+                "title": f"Result {i} for {query}",
+                "url": f"https://en.wikipedia.org/wiki/{query.replace(' ', '_')}_{i}",
+                "content": f"Stub search result {i} about {query}.",
+                "score": 1.0 - i / 10,
+            }
+            for i in range(int(body.get("max_results", 5)))
+        ],
+    }
+
+
+def mediawiki_query(params: dict) -> dict:
+    """Answer the subset of action=query requests the tools issue.
+
+    Every title exists except those starting with "Missing"; lowercase first
+    letters are normalized as MediaWiki does.
+    """
+    if params.get("list") == "search":
+        query = params.get("srsearch", "")
+        return {"query": {"searchinfo": {}, "search": [{"title": query.title()}] if query else []}}
+
+    generator_query = params.get("gsrsearch")
+    titles = [generator_query.title()] if generator_query else [t for t in params.get("titles", "").split("|") if t]
+    normalized = [{"from": t, "to": t[0].upper() + t[1:]} for t in titles if t[0].islower()]
+    titles = [t[0].upper() + t[1:] for t in titles]
+    pages = {}
+    for i, title in enumerate(titles, 1):
+        if title.startswith("Missing"):
+            pages[str(-i)] = {"ns": 0, "title": title, "missing": ""}
+            continue
+        page = {"pageid": int(_pageid(title)), "ns": 0, "title": title}
+        if "extracts" in params.get("prop", ""):
+            page["extract"] = LOREM.format(title=title)
+        if "info" in params.get("prop", ""):
+            page["fullurl"] = f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
+        pages[_pageid(title)] = page
+    query = {"pages": pages}
+    if normalized:
+        query["normalized"] = normalized
+    return {"batchcomplete": "", "query": query}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    error_rate = 0.0
+    requests = Counter()  # path -> requests served, for checking how many upstream calls a tool makes
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.requests[url.path] += 1
+        time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            self._send_json({"error": "injected failure"}, status=503)
+        elif url.path == "/w/api.php":
+            params = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+            self._send_json(mediawiki_query(params))
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.requests[urlparse(self.path).path] += 1
+        time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            self._send_json({"error": "injected failure"}, status=503)
+        elif urlparse(self.path).path == "/search":
+            self._send_json(tavily_search(body))
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 8900, latency_ms: float = 0.0,
+          error_rate: float = 0.0) -> ThreadingHTTPServer:
+    StubHandler.latency = latency_ms / 1000
+    StubHandler.error_rate = error_rate
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="artificial upstream latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of requests answered with 503, to exercise retries and circuit breaking")
+    args = parser.parse_args()
+    server = serve(args.host, args.port, args.latency_ms, args.error_rate)
+    print(f"Stub upstreams on http://{args.host}:{args.port} (latency {args.latency_ms} ms, error rate {args.error_rate})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
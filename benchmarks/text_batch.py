@@ -0,0 +1,189 @@
+"""Compare the per-item text tools with their batch variants.
+
+For each size, ``word_count`` / ``reverse_string`` are called once per item
+and ``word_count_batch`` / ``reverse_string_batch`` once for all items, both
+as a JSON list (``items``) and as newline-delimited ``text``.
+
+Targets:
+    inprocess  call the tools through the registry and its middleware, no
+               transport (``--app`` picks the backend tree to import)
+    fastapi    HTTP requests against a running classic_api backend
+    mcp        tool calls against a running MCP server
+
+Over a network the per-item path is only run for ``--per-item-sample``
+items; its rate is measured on that sample and the full-size time projected
+(marked ``projected`` in the report).
+
+Examples:
+    python benchmarks/text_batch.py inprocess --app classic_api --sizes 10000,1000000
+    python benchmarks/text_batch.py fastapi --url http://localhost:8000 -c 32 -o batch.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadtest import FastAPIDriver, MCPDriver  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_LINES = (
+    "the quick brown fox jumps over the lazy dog",
+    "lorem ipsum dolor sit amet",
+    "  leading and trailing whitespace  ",
+    "single",
+    "",
+)
+PAIRS = (("word_count", "word_count_batch"), ("reverse_string", "reverse_string_batch"))
+
+
+def make_items(size: int) -> list:
+    return [SAMPLE_LINES[i % len(SAMPLE_LINES)] + f" {i}" for i in range(size)]
+
+
+class InProcessDriver:
+    """Calls tools through the registry middleware chain of one backend tree."""
+
+    def __init__(self, app: str):
+        sys.path.insert(0, os.path.join(ROOT, app, "backend", "app"))
+        import registry
+        import metrics
+        import coalesce
+        import admission
+        # Same middleware chain the servers install; no concurrency caps or rate limits are configured.
+        for middleware in (metrics.middleware, admission.rate_limit, coalesce.middleware, admission.concurrency_limit):
+            registry.use(middleware)
+        self.tools = registry.discover()
+
+    async def per_item(self, tool: str, items: list, concurrency: int):
+        spec = self.tools[tool]
+        for s in items:
+            await spec.invoke(s=s)
+
+    async def batch(self, tool: str, args: dict):
+        return await self.tools[tool].invoke(**args)
+
+    async def close(self):
+        pass
+
+
+class RemoteDriver:
+    """Per-item calls spread over ``concurrency`` sessions; batch calls as a single request."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def per_item(self, tool: str, items: list, concurrency: int):
+        sessions = await asyncio.gather(*(self.driver.worker_session() for _ in range(concurrency)))
+        queue = iter(items)
+
+        async def worker(session):
+            for s in queue:
+                if not await self.driver.call(session, tool, {"s": s}):
+                    raise RuntimeError(f"{tool} call failed")
+
+        try:
+            await asyncio.gather(*(worker(session) for session in sessions))
+        finally:
+            await asyncio.gather(*(self.driver.close_session(s) for s in sessions), return_exceptions=True)
+
+    async def batch(self, tool: str, args: dict):
+        session = await self.driver.worker_session()
+        try:
+            if not await self.driver.call(session, tool, args):
+                raise RuntimeError(f"{tool} call failed")
+        finally:
+            await self.driver.close_session(session)
+
+    async def close(self):
+        await self.driver.close()
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def run(args) -> dict:
+    if args.target == "inprocess":
+        driver = InProcessDriver(args.app)
+    else:
+        remote = (FastAPIDriver if args.target == "fastapi" else MCPDriver)(args.url, args.concurrency)
+        driver = RemoteDriver(remote)
+    results = {}
+    try:
+        for size in args.sizes:
+            items = make_items(size)
+            text = "\n".join(items)
+            sample = items if args.target == "inprocess" else items[:args.per_item_sample]
+            for single, batch in PAIRS:
+                per_item = await timed(driver.per_item(single, sample, args.concurrency))
+                projected = len(sample) < size
+                per_item_total = per_item * size / len(sample)
+                as_list = await timed(driver.batch(batch, {"items": items}))
+                as_text = await timed(driver.batch(batch, {"text": text}))
+                results[f"{single}/{size}"] = {
+                    "items": size,
+                    "per_item_s": round(per_item_total, 4),
+                    "per_item_projected": projected,
+                    "batch_list_s": round(as_list, 4),
+                    "batch_text_s": round(as_text, 4),
+                    "speedup_list": round(per_item_total / as_list, 1),
+                    "speedup_text": round(per_item_total / as_text, 1),
+                }
+    finally:
+        await driver.close()
+    return {
+        "meta": {
+            "target": args.target,
+            "app": args.app if args.target == "inprocess" else None,
+            "url": args.url if args.target != "inprocess" else None,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def print_report(report: dict):
+    header = f"{'case':<24}{'per-item s':>14}{'batch list s':>14}{'batch text s':>14}{'x list':>9}{'x text':>9}"
+    print(header)
+    print("-" * len(header))
+    for case, r in report["results"].items():
+        per_item = f"{r['per_item_s']}{'*' if r['per_item_projected'] else ''}"
+        print(f"{case:<24}{per_item:>14}{r['batch_list_s']:>14}{r['batch_text_s']:>14}"
+              f"{r['speedup_list']:>9}{r['speedup_text']:>9}")
+    if any(r["per_item_projected"] for r in report["results"].values()):
+        print("* projected from --per-item-sample calls")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("target", choices=["inprocess", "fastapi", "mcp"])
+    parser.add_argument("--app", choices=["classic_api", "mcp_platform"], default="classic_api",
+                        help="backend tree for the inprocess target")
+    parser.add_argument("--url", help="server URL (default http://localhost:8000, plus /mcp for the MCP target)")
+    parser.add_argument("--sizes", default="10000,1000000", help="comma-separated item counts")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="concurrent per-item callers (remote targets)")
+    parser.add_argument("--per-item-sample", type=int, default=20000,
+                        help="per-item calls actually made against a remote target")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+    args.url = args.url or ("http://localhost:8000" if args.target == "fastapi" else "http://localhost:8000/mcp")
+    args.sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import config
+
+_MISSING = object()
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive cache key for free-text queries."""
+    return " ".join(query.lower().split())
+
+
+class MemoryCache:
+    """In-process LRU cache with per-entry TTL, bounded by entry count."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def aget(self, key: str):
+        return self.get(key)
+
+    async def aset(self, key: str, value, ttl: float):
+        self.set(key, value, ttl)
+
+    def count(self, prefix: str) -> int:
+        return sum(1 for key in self._data if key.startswith(prefix))
+
+    async def acount(self, prefix: str) -> int:
+        return self.count(prefix)
+
+
+class SQLiteCache:
+    """On-disk cache that survives restarts. Values must be JSON-serializable.
+
+    The async ``aget``/``aset`` used on the request path run the queries on one
+    dedicated thread, so disk I/O and eviction scans never block the event loop.
+    Eviction runs every ``evict_every`` writes, so the table may briefly hold
+    up to that many entries beyond ``max_entries``.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, evict_every: int = 64):
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-cache")
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires_at REAL, used_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_used_at ON cache (used_at)")
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return _MISSING
+            if row[1] < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return _MISSING
+            self._conn.execute("UPDATE cache SET used_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            self._writes += 1
+            if self._writes % self.evict_every == 0:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        # Expired rows, then least-recently-used rows beyond the size bound; both
+        # walk an index rather than the table.
+        self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+        if self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    async def aget(self, key: str):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.get, key)
+
+    async def aset(self, key: str, value, ttl: float):
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.set, key, value, ttl)
+
+    def count(self, prefix: str) -> int:
+        # A key range rather than LIKE, so the primary-key index is used.
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE key >= ? AND key < ?", (prefix, upper)
+            ).fetchone()[0]
+
+    async def acount(self, prefix: str) -> int:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.count, prefix)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution.
+
+    The shared call is cancelled once every caller waiting on it has been.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._inflight = {}  # key -> [task, waiters]
+
+    def _forget(self, key, flight):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    async def do(self, key, fn):
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = self._inflight[key] = [asyncio.ensure_future(fn()), 0]
+            flight[0].add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.coalesced += 1
+        task = flight[0]
+        flight[1] += 1
+        try:
+            # Shield so one waiter being cancelled doesn't cancel the shared call.
+            return await asyncio.shield(task)
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0 and not task.done():
+                # Every waiter left; don't leave the call running for nobody.
+                self._forget(key, flight)
+                task.cancel()
+
+
+class ResultCache:
+    """Read-through cache for one tool: cache lookup, then a single-flight upstream call."""
+
+    def __init__(self, namespace: str, backend, ttl: float):
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._flight = SingleFlight()
+
+    async def get_or_call(self, key: str, fn):
+        """Return the cached value for ``key`` or compute it with ``fn()``.
+
+        Exceptions raised by ``fn`` propagate and are not cached.
+        """
+        full_key = f"{self.namespace}:{key}"
+        value = await self.backend.aget(full_key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        async def _fill():
+            result = await fn()
+            await self.backend.aset(full_key, result, self.ttl)
+            return result
+
+        return await self._flight.do(full_key, _fill)
+
+    async def get(self, key: str):
+        """Return the cached value for ``key``, or None, without computing it."""
+        value = await self.backend.aget(f"{self.namespace}:{key}")
+        if value is _MISSING:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    async def contains(self, key: str) -> bool:
+        """Whether ``key`` is cached; unlike :meth:`get`, not counted as a hit or miss."""
+        return await self.backend.aget(f"{self.namespace}:{key}") is not _MISSING
+
+    async def put(self, key: str, value):
+        """Store ``value`` for ``key`` directly, e.g. when fetched in a batch or ahead of demand."""
+        await self.backend.aset(f"{self.namespace}:{key}", value, self.ttl)
+
+    async def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self._flight.coalesced,
+            "entries": await self.backend.acount(f"{self.namespace}:"),
+        }
+
+
+_backend = None
+CACHES = {}
+
+
+def _get_backend():
+    global _backend
+    if _backend is None:
+        if config.CACHE_BACKEND == "sqlite":
+            _backend = SQLiteCache(config.CACHE_SQLITE_PATH, max_entries=config.CACHE_MAX_ENTRIES)
+        else:
+            _backend = MemoryCache(max_entries=config.CACHE_MAX_ENTRIES)
+    return _backend
+
+
+def get_cache(namespace: str, ttl: float) -> ResultCache:
+    """Return the (shared-backend) result cache for a tool."""
+    if namespace not in CACHES:
+        CACHES[namespace] = ResultCache(namespace, _get_backend(), ttl)
+    return CACHES[namespace]
+
+
+async def cache_stats() -> dict:
+    return {namespace: await cache.stats() for namespace, cache in CACHES.items()}
+
+
+async def prometheus_lines() -> list:
+    """Cache counters in Prometheus text format, for the /metrics collector."""
+    stats = sorted((await cache_stats()).items())
+    lines = []
+    for name, kind, help_text in (
+        ("hits", "counter", "Result cache hits."),
+        ("misses", "counter", "Result cache misses."),
+        ("coalesced", "counter", "Cache misses that joined an in-flight upstream call."),
+        ("entries", "gauge", "Entries of this cache currently in the backend."),
+    ):
+        metric = f"tool_cache_{name}" + ("_total" if kind == "counter" else "")
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(f'{metric}{{cache="{namespace}"}} {values[name]}' for namespace, values in stats)
+    return lines
@@ -0,0 +1,75 @@
+import json
+import logging
+import progress
+from cache import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# tool name -> SingleFlight of that tool's in-flight calls
+FLIGHTS = {}
+# (tool name, call key) -> _Fanout of the callers waiting on that call
+_FANOUTS = {}
+
+
+class _Fanout:
+    """Progress reporter of a shared call, forwarding each update to every joined caller's reporter."""
+
+    def __init__(self):
+        self.waiters = 0
+        self.reporters = []
+
+    async def __call__(self, progress_, total=None, message=None):
+        for reporter in list(self.reporters):
+            try:
+                await reporter(progress_, total, message)
+            except Exception as e:
+                # One caller's transport failing mustn't starve the others.
+                logger.debug(f"Dropped progress update: {e}")
+
+
+def _key(kwargs: dict) -> str:
+    return json.dumps(kwargs, sort_keys=True, default=repr)
+
+
+async def _shared_call(fanout: _Fanout, call_next):
+    progress.set_reporter(fanout)  # the shared task runs in its own copy of the context
+    return await call_next()
+
+
+async def middleware(spec, kwargs, call_next):
+    """Registry middleware: identical concurrent calls share one execution.
+
+    Only applies to tools whose module sets ``IDEMPOTENT = True``; every waiter
+    receives the same result (or exception) from the single call, and its
+    progress updates.
+    """
+    if not spec.meta.get("IDEMPOTENT"):
+        return await call_next()
+    flight = FLIGHTS.get(spec.name)
+    if flight is None:
+        flight = FLIGHTS[spec.name] = SingleFlight()
+    key = _key(kwargs)
+    fanout = _FANOUTS.get((spec.name, key))
+    if fanout is None:
+        fanout = _FANOUTS[(spec.name, key)] = _Fanout()
+    reporter = progress.current_reporter()
+    if reporter is not None:
+        fanout.reporters.append(reporter)
+    fanout.waiters += 1
+    try:
+        return await flight.do(key, lambda: _shared_call(fanout, call_next))
+    finally:
+        fanout.waiters -= 1
+        if reporter is not None:
+            fanout.reporters.remove(reporter)
+        if fanout.waiters == 0:
+            del _FANOUTS[(spec.name, key)]
+
+
+def prometheus_lines() -> list:
+    """Coalesced-call counters in Prometheus text format, for the /metrics collector."""
+    return [
+        "# HELP tool_calls_coalesced_total Tool calls served by joining an identical in-flight call.",
+        "# TYPE tool_calls_coalesced_total counter",
+        *(f'tool_calls_coalesced_total{{tool="{name}"}} {flight.coalesced}' for name, flight in sorted(FLIGHTS.items())),
+    ]
@@ -4,6 +4,71 @@ load_dotenv()
 
 class Config:
     TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "YOUR_TAVILY_API_KEY")
+    # Optional upstream overrides, e.g. benchmarks/stub_upstreams.py for offline load tests.
+    TAVILY_API_URL = os.getenv("TAVILY_API_URL", "")
+    WIKIPEDIA_API_URL = os.getenv("WIKIPEDIA_API_URL", "")
+    # Comma-separated tool names to expose; empty means every tool in tools/
+    ENABLED_TOOLS = [t.strip() for t in os.getenv("ENABLED_TOOLS", "").split(",") if t.strip()]
+    # /tools/batch limits
+    BATCH_MAX_CALLS = int(os.getenv("BATCH_MAX_CALLS", "1000"))
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "16"))
+    # Shared pooled HTTP client for the external-API tools (upstream.py)
+    UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "20"))
+    UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "10"))
+    UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+    UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "3"))
+    UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "10"))
+    UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", "2"))
+    UPSTREAM_BACKOFF = float(os.getenv("UPSTREAM_BACKOFF", "0.2"))
+    UPSTREAM_BREAKER_THRESHOLD = int(os.getenv("UPSTREAM_BREAKER_THRESHOLD", "5"))
+    UPSTREAM_BREAKER_RESET = float(os.getenv("UPSTREAM_BREAKER_RESET", "30"))
+    # Overall per-call deadlines for the external-API tools, retries included
+    WEB_SEARCH_TIMEOUT = float(os.getenv("WEB_SEARCH_TIMEOUT", "15"))
+    WIKIPEDIA_TIMEOUT = float(os.getenv("WIKIPEDIA_TIMEOUT", "10"))
+    # Cache intros of Wikipedia articles linked from web_search results in the background
+    WIKIPEDIA_PREWARM = os.getenv("WIKIPEDIA_PREWARM", "true").lower() == "true"
+    # Result cache for external-lookup tools ("memory" or "sqlite")
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "tool_cache.sqlite3")
+    WEB_SEARCH_CACHE_TTL = float(os.getenv("WEB_SEARCH_CACHE_TTL", "300"))
+    WIKIPEDIA_CACHE_TTL = float(os.getenv("WIKIPEDIA_CACHE_TTL", "3600"))
+    # python_exec sandbox process pool
+    PYTHON_EXEC_WORKERS = int(os.getenv("PYTHON_EXEC_WORKERS", "2"))
+    PYTHON_EXEC_CPU_SECONDS = float(os.getenv("PYTHON_EXEC_CPU_SECONDS", "2"))
+    PYTHON_EXEC_TIMEOUT = float(os.getenv("PYTHON_EXEC_TIMEOUT", "5"))
+    PYTHON_EXEC_MEMORY_MB = int(os.getenv("PYTHON_EXEC_MEMORY_MB", "256"))
+    PYTHON_EXEC_MAX_TASKS_PER_WORKER = int(os.getenv("PYTHON_EXEC_MAX_TASKS_PER_WORKER", "500"))
+    PYTHON_EXEC_CODE_CACHE_SIZE = int(os.getenv("PYTHON_EXEC_CODE_CACHE_SIZE", "256"))
+    # Memoized results of pure expressions; 0 disables memoization
+    PYTHON_EXEC_RESULT_CACHE_SIZE = int(os.getenv("PYTHON_EXEC_RESULT_CACHE_SIZE", "1024"))
+    # Longer results are not memoized; the memo holds at most PYTHON_EXEC_RESULT_CACHE_MAX_CHARS in total
+    PYTHON_EXEC_RESULT_MAX_CHARS = int(os.getenv("PYTHON_EXEC_RESULT_MAX_CHARS", "65536"))
+    PYTHON_EXEC_RESULT_CACHE_MAX_CHARS = int(os.getenv("PYTHON_EXEC_RESULT_CACHE_MAX_CHARS", str(16 * 1024 * 1024)))
+    # Directory word_count_file may read from (paths are resolved inside it); empty disables the tool
+    TEXT_FILES_ROOT = os.getenv("TEXT_FILES_ROOT", "")
+    # Admission control: per-tool concurrency caps ("tool=max,..."; unlisted tools are unlimited),
+    # the wait queue each capped tool allows, and per-client rate limiting (calls/s; 0 disables)
+    TOOL_CONCURRENCY = {
+        name.strip(): int(limit)
+        for name, limit in (item.split("=", 1) for item in os.getenv(
+            "TOOL_CONCURRENCY",
+            "web_search=8,wikipedia_summary=8,wikipedia_summary_batch=4,python_exec=4,word_count_stream=4").split(",") if "=" in item)
+    }
+    TOOL_QUEUE_SIZE = int(os.getenv("TOOL_QUEUE_SIZE", "32"))
+    TOOL_QUEUE_TIMEOUT = float(os.getenv("TOOL_QUEUE_TIMEOUT", "10"))
+    RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "0"))
+    RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "20"))
+    # Proxies (addresses or CIDRs, comma-separated) whose X-Client-Id / X-Forwarded-For headers are trusted;
+    # requests from anywhere else are rate limited by their peer address
+    TRUSTED_PROXIES = [item.strip() for item in os.getenv("TRUSTED_PROXIES", "").split(",") if item.strip()]
+    # Opt-in profiling: per-phase timings of every tool call (decode/validate/execute/encode), and
+    # profiling of a sampled fraction of calls ("sampling" -> collapsed stacks, "cprofile" -> pstats)
+    PROFILE_PHASES = os.getenv("PROFILE_PHASES", "false").lower() == "true"
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_MODE = os.getenv("PROFILE_MODE", "sampling")
+    PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
     # Add more keys as needed
 
 config = Config() 
\ No newline at end of file
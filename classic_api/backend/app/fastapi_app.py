@@ -1,78 +1,255 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import Any, Dict
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, List
 import asyncio
+import json
+import math
+from config import config
+import registry
+from registry import discover
+import cache
+from cache import cache_stats
+import metrics
+import coalesce
+import admission
+import progress
+import sandbox
+import upstream
+import profiling
+from tools._text import TextStats
 
 app = FastAPI()
 
-# --- Tool Request Models ---
-class GreetRequest(BaseModel):
-    name: str
-class AddRequest(BaseModel):
-    a: int
-    b: int
-class ReverseStringRequest(BaseModel):
-    s: str
-class WordCountRequest(BaseModel):
-    s: str
-class WikipediaSummaryRequest(BaseModel):
-    query: str
-class WebSearchRequest(BaseModel):
-    query: str
-class PythonExecRequest(BaseModel):
-    code: str
-class ToolQuestionRequest(BaseModel):
-    question: str
-
-# --- Tool Imports ---
-from tools.greet import run as greet
-from tools.add import run as add
-from tools.reverse_string import run as reverse_string
-from tools.word_count import run as word_count
-from tools.wikipedia_summary import run as wikipedia_summary
-from tools.web_search import run as web_search
-from tools.python_exec import run as python_exec
-from tools.tool1 import run as tool1
-from tools.tool2 import run as tool2
+# --- Tool Registry ---
+# Every module in tools/ that defines `run` becomes a tool; request models are
+# derived from the `run` signature and modules are imported on first call.
+TOOLS = discover(enabled=config.ENABLED_TOOLS)
+registry.use(metrics.middleware)
+registry.use(admission.rate_limit)
+registry.use(coalesce.middleware)
+# Inside coalescing, so duplicates joining an in-flight call don't take a slot.
+registry.use(admission.concurrency_limit)
+# Innermost: cprofile mode runs sync tools itself, on the worker thread.
+if config.PROFILE_SAMPLE_RATE > 0:
+    registry.use(profiling.middleware)
+admission.configure(
+    config.TOOL_CONCURRENCY,
+    queue_size=config.TOOL_QUEUE_SIZE,
+    queue_timeout=config.TOOL_QUEUE_TIMEOUT,
+    rate=config.RATE_LIMIT_PER_SECOND,
+    burst=config.RATE_LIMIT_BURST,
+    trusted_proxies=config.TRUSTED_PROXIES,
+)
+metrics.register_collector(cache.prometheus_lines)
+metrics.register_collector(coalesce.prometheus_lines)
+metrics.register_collector(admission.prometheus_lines)
+metrics.register_collector(upstream.prometheus_lines)
+metrics.register_collector(profiling.prometheus_lines)
+
+@app.middleware("http")
+async def identify_client(request: Request, call_next):
+    # Rate limits are per client: the peer address, or the client a trusted proxy names.
+    client = admission.client_identity(request.client.host if request.client else "unknown", request.headers)
+    token = admission.set_client(client)
+    try:
+        return await call_next(request)
+    finally:
+        admission.reset_client(token)
+
+@app.exception_handler(admission.Overloaded)
+async def overloaded_handler(request: Request, exc: admission.Overloaded):
+    # Fail fast so callers back off instead of queueing behind a saturated tool.
+    return JSONResponse(status_code=429, content={"detail": str(exc)},
+                        headers={"Retry-After": str(math.ceil(exc.retry_after))})
+
+@app.on_event("startup")
+async def warm_sandbox():
+    # Start python_exec workers up front so the first call doesn't pay process spawn.
+    if "python_exec" in TOOLS:
+        sandbox.get_pool()
+
+@app.on_event("shutdown")
+async def stop_sandbox():
+    sandbox.shutdown_pool()
+    await upstream.aclose_all()
+    profiling.dump()
+
+def _decode_body(body: bytes):
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError as e:
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body", e.pos), "msg": "JSON decode error", "input": {}, "ctx": {"error": e.msg}}]
+        )
+
+def _validate(spec, payload):
+    if not isinstance(payload, dict):
+        raise RequestValidationError(
+            [{"type": "model_attributes_type", "loc": ("body",), "msg": "Input should be a valid dictionary", "input": payload}]
+        )
+    try:
+        return spec.request_model(**payload)
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+
+def _make_endpoint(spec):
+    # Decodes and validates the body itself (with the same 422 errors FastAPI
+    # would give) so each phase can be timed; see profiling.py.
+    async def endpoint(request: Request):
+        trace = profiling.start_trace(spec.name)
+        payload = _decode_body(await request.body())
+        trace.mark("decode")
+        req = _validate(spec, payload)
+        trace.mark("validate")
+        answer = await spec.invoke(**dict(req))
+        trace.mark("execute")
+        response = JSONResponse(jsonable_encoder({"answer": answer}))
+        trace.mark("encode")
+        trace.finish()
+        if trace:
+            response.headers["Server-Timing"] = trace.server_timing()
+        return response
+    endpoint.__name__ = f"{spec.name}_endpoint"
+    return endpoint
+
+def _request_body_schema(spec) -> dict:
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": spec.parameters_schema()}}}}
 
 # --- Endpoints ---
-@app.post("/tools/greet")
-async def greet_endpoint(req: GreetRequest):
-    return {"answer": await greet(req.name)}
-
-@app.post("/tools/add")
-async def add_endpoint(req: AddRequest):
-    return {"answer": await add(req.a, req.b)}
-
-@app.post("/tools/reverse_string")
-async def reverse_string_endpoint(req: ReverseStringRequest):
-    return {"answer": await reverse_string(req.s)}
-
-@app.post("/tools/word_count")
-async def word_count_endpoint(req: WordCountRequest):
-    return {"answer": await word_count(req.s)}
-
-@app.post("/tools/wikipedia_summary")
-async def wikipedia_summary_endpoint(req: WikipediaSummaryRequest):
-    return {"answer": await wikipedia_summary(req.query)}
-
-@app.post("/tools/web_search")
-async def web_search_endpoint(req: WebSearchRequest):
-    return {"answer": await web_search(req.query)}
-
-@app.post("/tools/python_exec")
-async def python_exec_endpoint(req: PythonExecRequest):
-    return {"answer": await python_exec(req.code)}
-
-@app.post("/tools/tool1")
-async def tool1_endpoint(req: ToolQuestionRequest):
-    # tool1 is sync, so run in threadpool
-    loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(None, tool1, req.dict())
-    return result
-
-@app.post("/tools/tool2")
-async def tool2_endpoint(req: ToolQuestionRequest):
-    loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(None, tool2, req.dict())
-    return result 
\ No newline at end of file
+@app.get("/tools")
+async def list_tools():
+    """Catalogue of available tools with their JSON parameter schemas."""
+    return [
+        {"name": spec.name, "description": spec.description, "parameters": spec.parameters_schema(),
+         "idempotent": bool(spec.meta.get("IDEMPOTENT")), "reports_progress": bool(spec.meta.get("REPORTS_PROGRESS"))}
+        for spec in TOOLS.values()
+    ]
+
+@app.get("/cache/stats")
+async def cache_stats_endpoint():
+    """Hit/miss/coalesced counters for the external-lookup result caches."""
+    return await cache_stats()
+
+@app.get("/profiles")
+async def profiles_endpoint():
+    """Profiling mode, sample rate and per-tool sample counts (see PROFILE_SAMPLE_RATE)."""
+    return profiling.summary()
+
+@app.get("/profiles/{tool}", response_class=PlainTextResponse)
+async def tool_profile_endpoint(tool: str):
+    """Collapsed stacks sampled from ``tool`` calls, ready for flamegraph.pl or speedscope."""
+    return PlainTextResponse(profiling.collapsed(tool))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Per-tool call/error counters, in-flight gauges and latency histograms (Prometheus format)."""
+    return PlainTextResponse(await metrics.render(), media_type="text/plain; version=0.0.4")
+
+# --- Batch Invocation ---
+class BatchCall(BaseModel):
+    tool: str
+    args: Dict[str, Any] = {}
+
+async def _run_batch_call(index: int, call: BatchCall, semaphore: asyncio.Semaphore,
+                          reporter=None) -> Dict[str, Any]:
+    item = {"index": index, "tool": call.tool}
+    if call.tool not in TOOLS:
+        item["error"] = f"Unknown tool '{call.tool}'"
+        return item
+    spec = TOOLS[call.tool]
+    try:
+        req = spec.request_model(**call.args)
+    except ValidationError as e:
+        item["error"] = e.errors()
+        return item
+    async with semaphore:
+        token = progress.set_reporter(reporter)
+        try:
+            item["answer"] = await spec.invoke(**dict(req))
+        except admission.Overloaded as e:
+            item["error"] = str(e)
+            item["retry_after"] = e.retry_after
+        except Exception as e:
+            item["error"] = str(e)
+        finally:
+            progress.reset_reporter(token)
+    return item
+
+def _check_batch_size(calls: List[BatchCall]):
+    if len(calls) > config.BATCH_MAX_CALLS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {config.BATCH_MAX_CALLS} calls")
+
+@app.post("/tools/batch")
+async def batch_endpoint(calls: List[BatchCall]):
+    """Run many tool calls concurrently; results are returned in request order."""
+    _check_batch_size(calls)
+    semaphore = asyncio.Semaphore(config.BATCH_CONCURRENCY)
+    results = await asyncio.gather(*(_run_batch_call(i, call, semaphore) for i, call in enumerate(calls)))
+    return {"results": results}
+
+@app.post("/tools/batch/stream")
+async def batch_stream_endpoint(calls: List[BatchCall]):
+    """Like /tools/batch, but emits one NDJSON line per call as soon as it completes.
+
+    Progress a tool reports while it runs (``progress.report``) is streamed
+    too, as ``{"index", "tool", "progress", "total", "message"}`` lines ahead
+    of that call's result.
+    """
+    _check_batch_size(calls)
+    semaphore = asyncio.Semaphore(config.BATCH_CONCURRENCY)
+    lines = asyncio.Queue()
+
+    async def _run(index: int, call: BatchCall):
+        async def reporter(progress: float, total: float = None, message: str = None):
+            lines.put_nowait({"index": index, "tool": call.tool, "progress": progress, "total": total, "message": message})
+        lines.put_nowait(await _run_batch_call(index, call, semaphore, reporter))
+
+    async def _stream():
+        tasks = [asyncio.ensure_future(_run(i, call)) for i, call in enumerate(calls)]
+        try:
+            pending = len(tasks)
+            while pending:
+                line = await lines.get()
+                if "progress" not in line:
+                    pending -= 1
+                yield json.dumps(line, default=str) + "\n"
+        finally:
+            # Client went away or stream finished: don't leave orphaned tool calls running.
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
+# --- Streaming Uploads ---
+async def _count_upload(request: Request, top_n: int = 0) -> dict:
+    stats = TextStats(top_n=top_n)
+    async for chunk in request.stream():
+        stats.feed(chunk)
+    return stats.finish()
+
+# Not discovered from tools/ since it reads the request itself, but invoked
+# through the same middleware (metrics, rate limit, concurrency cap) as the rest.
+WORD_COUNT_STREAM = registry.ToolSpec(
+    "word_count_stream", __name__, "Count words in a streamed upload.",
+    params=[("top_n", int, 0)], returns=dict, is_async=True, meta={}, run=_count_upload,
+)
+
+@app.post("/tools/word_count/stream")
+async def word_count_stream_endpoint(request: Request, top_n: int = 0):
+    """Count words, lines and bytes (and optionally the top_n terms) of the raw request body.
+
+    The body is consumed chunk by chunk as it arrives, so memory stays bounded
+    however large the upload; send it with e.g. ``curl --data-binary @dump.log``.
+    """
+    return {"answer": await WORD_COUNT_STREAM.invoke(request=request, top_n=top_n)}
+
+
+# Registered last so the fixed /tools/batch routes above take precedence.
+for _spec in TOOLS.values():
+    app.post(f"/tools/{_spec.name}", summary=_spec.description, openapi_extra=_request_body_schema(_spec))(
+        _make_endpoint(_spec)
+    )
@@ -0,0 +1,35 @@
+import contextvars
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Set per call by the transport; tools stay transport-agnostic and just call report().
+_reporter = contextvars.ContextVar("progress_reporter", default=None)
+
+
+def set_reporter(reporter):
+    """Route this call's progress to ``reporter(progress, total, message)``; returns a reset token."""
+    return _reporter.set(reporter)
+
+
+def reset_reporter(token):
+    _reporter.reset(token)
+
+
+def current_reporter():
+    """This call's reporter, or None when its transport can't deliver progress."""
+    return _reporter.get()
+
+
+async def report(progress: float, total: float = None, message: str = None):
+    """Send a progress update, optionally carrying a partial result as ``message``.
+
+    A no-op when the caller's transport can't deliver progress (e.g. plain HTTP).
+    """
+    reporter = _reporter.get()
+    if reporter is not None:
+        try:
+            await reporter(progress, total, message)
+        except Exception as e:
+            # Progress is best-effort; never fail the tool call over it.
+            logger.debug(f"Dropped progress update: {e}")
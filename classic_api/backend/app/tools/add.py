@@ -1,3 +1,5 @@
+IDEMPOTENT = True
+
 async def run(a: int, b: int) -> int:
     """Add two numbers."""
     return a + b 
\ No newline at end of file
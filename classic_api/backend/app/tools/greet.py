@@ -1,3 +1,5 @@
+IDEMPOTENT = True
+
 async def run(name: str) -> str:
     """Greet a person by name."""
     return f"Hello, {name}!" 
\ No newline at end of file
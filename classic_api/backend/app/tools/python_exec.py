@@ -1,16 +1,15 @@
 import logging
+from sandbox import get_pool
 
 logger = logging.getLogger(__name__)
 
 async def run(code: str) -> str:
-    """Execute a Python code snippet and return the output."""
+    """Execute a Python expression and return the result, e.g. 'sum([1,2,3])' or 'max(5, 10)'. Only safe built-ins are allowed."""
     try:
-        allowed_builtins = {'abs', 'min', 'max', 'sum', 'len', 'range'}
-        safe_globals = {"__builtins__": {k: __builtins__[k] for k in allowed_builtins}}
         logger.info(f"Executing code: {code}")
-        result = eval(code, safe_globals)
-        logger.info(f"Execution result: {result}")
-        return str(result)
+        result = await get_pool().evaluate(code)
+        logger.debug(f"Execution result: {result}")
+        return result
     except Exception as e:
         logger.error(f"Error executing code '{code}': {e}")
         return f"Error: {e}" 
\ No newline at end of file
@@ -1,3 +1,5 @@
+IDEMPOTENT = True
+
 async def run(s: str) -> str:
     """Reverse a string."""
     return s[::-1] 
\ No newline at end of file
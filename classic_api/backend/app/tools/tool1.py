@@ -1,3 +1,5 @@
-def run(input: dict):
-    question = input.get("question", "")
-    return {"answer": f"Tool1 received: {question}"} 
\ No newline at end of file
+IDEMPOTENT = True
+
+def run(question: str) -> str:
+    """Tool1: answer a question."""
+    return f"Tool1 received: {question}"
\ No newline at end of file
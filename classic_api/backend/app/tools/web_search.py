@@ -1,18 +1,45 @@
 import logging
-from tavily import TavilyClient
 from config import config
+from cache import get_cache, normalize_query
+from upstream import get_upstream
+from tools import _wikipedia
+import progress
+
+IDEMPOTENT = True
+REPORTS_PROGRESS = True
 
 logger = logging.getLogger(__name__)
 
-tavily = TavilyClient(api_key=config.TAVILY_API_KEY)
+# Tavily's REST API, called over the shared pooled client instead of the tavily SDK's sync stack.
+tavily = get_upstream(
+    "tavily",
+    config.TAVILY_API_URL.rstrip("/") or "https://api.tavily.com",
+    headers={"Authorization": f"Bearer {config.TAVILY_API_KEY}"},
+)
+cache = get_cache("web_search", ttl=config.WEB_SEARCH_CACHE_TTL)
+PREWARM_WIKIPEDIA = config.WIKIPEDIA_PREWARM and (not config.ENABLED_TOOLS or "wikipedia_summary" in config.ENABLED_TOOLS)
+
+async def _search(query: str) -> str:
+    await progress.report(0, message=f"Searching the web for '{query}'")
+    response = await tavily.request(
+        "POST", "/search", json={"query": query, "max_results": 3}, deadline=config.WEB_SEARCH_TIMEOUT,
+    )
+    result = response.json()
+    logger.debug(f"Web search result: {result}")
+    results = result['results']
+    if PREWARM_WIKIPEDIA:
+        # Agents often follow a search with a Wikipedia lookup of a hit; have it cached by then.
+        _wikipedia.prewarm([item.get('url') for item in results])
+    # Hand each result to the client as a partial result before the joined answer
+    for i, item in enumerate(results, 1):
+        await progress.report(i, len(results), item['content'])
+    return "\n\n".join([item['content'] for item in results])
 
 async def run(query: str) -> str:
     """Search the web for up-to-date information."""
     try:
         logger.info(f"Web search query: {query}")
-        result = tavily.search(query, max_results=3)
-        logger.info(f"Web search result: {result}")
-        return "\n\n".join([item['content'] for item in result['results']])
+        return await cache.get_or_call(normalize_query(query), lambda: _search(query))
     except Exception as e:
         logger.error(f"Error in web_search for query '{query}': {e}")
-        return f"Error: {e}" 
\ No newline at end of file
+        return f"Error: {e}"
@@ -0,0 +1,38 @@
+import asyncio
+import logging
+from typing import Dict, List
+from cache import normalize_query
+from tools._wikipedia import cache, search_summary, title_cache, title_summaries
+
+logger = logging.getLogger(__name__)
+
+async def run(queries: List[str]) -> Dict[str, str]:
+    """Get Wikipedia summaries for several topics or article titles at once."""
+    answers = {}
+    pending = []
+    for query in dict.fromkeys(queries):
+        cached = await title_cache.get(normalize_query(query))
+        if cached is not None:
+            answers[query] = cached
+        else:
+            pending.append(query)
+
+    # Queries that are exact article titles are fetched together, 20 per request...
+    try:
+        found = await title_summaries(pending) if pending else {}
+    except Exception as e:
+        logger.warning(f"Batched Wikipedia title lookup failed: {e}")
+        found = {}
+    for query, extract in found.items():
+        await title_cache.put(normalize_query(query), extract)
+        answers[query] = extract
+
+    # ...the rest are searched for, concurrently.
+    rest = [query for query in pending if query not in found]
+    results = await asyncio.gather(
+        *(cache.get_or_call(normalize_query(q), lambda q=q: search_summary(q)) for q in rest),
+        return_exceptions=True,
+    )
+    for query, result in zip(rest, results):
+        answers[query] = f"Error: {result}" if isinstance(result, Exception) else result
+    return {query: answers[query] for query in dict.fromkeys(queries)}
@@ -1,3 +1,5 @@
+IDEMPOTENT = True
+
 async def run(s: str) -> int:
     """Count the number of words in a string."""
     return len(s.split()) 
\ No newline at end of file
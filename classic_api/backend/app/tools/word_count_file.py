@@ -0,0 +1,28 @@
+import logging
+import os
+from typing import Union
+from config import config
+from tools._text import STREAM_CHUNK_SIZE, TextStats
+
+logger = logging.getLogger(__name__)
+
+def _resolve(path: str) -> str:
+    root = os.path.realpath(config.TEXT_FILES_ROOT)
+    target = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, target]) != root:
+        raise ValueError(f"'{path}' is outside the allowed directory")
+    return target
+
+def run(path: str, top_n: int = 0) -> Union[dict, str]:
+    """Count words, lines and bytes of a text file on the server (relative to its TEXT_FILES_ROOT), streaming it in bounded memory; optionally the top_n most frequent terms."""
+    if not config.TEXT_FILES_ROOT:
+        return "Error: file access is disabled (TEXT_FILES_ROOT is not set)."
+    try:
+        stats = TextStats(top_n=top_n)
+        with open(_resolve(path), "rb") as f:
+            while chunk := f.read(STREAM_CHUNK_SIZE):
+                stats.feed(chunk)
+        return stats.finish()
+    except Exception as e:
+        logger.error(f"Error in word_count_file for '{path}': {e}")
+        return f"Error: {e}"
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import random
+import time
+import httpx
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Worth retrying: the upstream is throttling or briefly unavailable.
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, httpx.RemoteProtocolError)
+
+_clients = {}  # upstream name -> UpstreamClient
+
+
+class CircuitOpen(Exception):
+    """The upstream has been failing; calls are refused until its reset timeout passes."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    fail immediately for ``reset_timeout`` seconds. Then a single trial call
+    is let through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self, name: str):
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_in_flight):
+            retry_in = self.reset_timeout - (time.monotonic() - self.opened_at)
+            raise CircuitOpen(f"{name} is unavailable (circuit open, retry in {max(retry_in, 0):.0f}s)")
+        if state == "half_open":
+            self._trial_in_flight = True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def release_trial(self):
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class UpstreamClient:
+    """Pooled async HTTP client for one external API, with retries and a circuit breaker.
+
+    One ``httpx.AsyncClient`` per upstream host keeps connections alive
+    across calls and caps them per host. Connection errors, timeouts and
+    throttling/gateway responses are retried with full-jitter exponential
+    backoff, within the caller's overall ``deadline``; every call that still
+    fails counts towards opening the circuit, so a struggling upstream is
+    failed fast instead of holding requests on our servers.
+    """
+
+    def __init__(self, name: str, base_url: str, headers: dict = None, max_connections: int = 20,
+                 max_keepalive_connections: int = 10, keepalive_expiry: float = 30.0,
+                 connect_timeout: float = 3.0, read_timeout: float = 10.0, retries: int = 2,
+                 backoff_factor: float = 0.2, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.counts = {"ok": 0, "error": 0, "retried": 0, "rejected": 0}
+        self._client_kwargs = dict(
+            base_url=base_url,
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        )
+        self._client = None
+        self._loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Pooled connections belong to the loop that opened them.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(**self._client_kwargs)
+            self._loop = loop
+        return self._client
+
+    def _backoff(self, attempt: int, response: httpx.Response = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return random.uniform(0, self.backoff_factor * (2 ** attempt))
+
+    async def request(self, method: str, path: str, deadline: float = None, **kwargs) -> httpx.Response:
+        """Send a request and return the response, raising for errors that persist after retries.
+
+        ``deadline`` bounds the whole call, retries and backoff included, in seconds;
+        ``httpx.TimeoutException`` is raised once it is used up.
+        """
+        try:
+            self.breaker.before_call(self.name)
+        except CircuitOpen:
+            self.counts["rejected"] += 1
+            raise
+        try:
+            response = await self._send_with_retries(method, path, deadline, **kwargs)
+        except httpx.HTTPStatusError as e:
+            if e.response.is_server_error:
+                self._failed()
+            else:
+                # The upstream answered; a 4xx is our request's fault, not its health.
+                self.counts["error"] += 1
+                self.breaker.record_success()
+            raise
+        except httpx.HTTPError:
+            self._failed()
+            raise
+        except BaseException:
+            self.breaker.release_trial()  # e.g. cancelled: don't leave a half-open circuit stuck
+            raise
+        self.breaker.record_success()
+        self.counts["ok"] += 1
+        return response
+
+    async def _send_with_retries(self, method: str, path: str, deadline: float, **kwargs) -> httpx.Response:
+        client = self._get_client()
+        give_up_at = time.monotonic() + deadline if deadline else None
+        attempt = 0
+        while True:
+            response = error = None
+            remaining = give_up_at - time.monotonic() if give_up_at is not None else None
+            if remaining is not None and remaining <= 0:
+                raise httpx.TimeoutException(f"{self.name} {method} {path} exceeded its {deadline:g}s deadline")
+            try:
+                # Bound each attempt by what's left of the deadline, not just the client's own timeouts.
+                response = await asyncio.wait_for(client.request(method, path, **kwargs), remaining)
+            except asyncio.TimeoutError:
+                raise httpx.TimeoutException(f"{self.name} {method} {path} exceeded its {deadline:g}s deadline") from None
+            except RETRY_EXCEPTIONS as e:
+                error = e
+            if response is not None and response.status_code not in RETRY_STATUS_CODES:
+                return response.raise_for_status()
+            delay = self._backoff(attempt, response)
+            out_of_time = give_up_at is not None and time.monotonic() + delay >= give_up_at
+            if attempt >= self.retries or out_of_time:
+                if error is not None:
+                    raise error
+                response.raise_for_status()
+            attempt += 1
+            self.counts["retried"] += 1
+            logger.warning(f"{self.name} {method} {path} failed ({error or response.status_code}), "
+                           f"retry {attempt} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def _failed(self):
+        self.counts["error"] += 1
+        self.breaker.record_failure()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def get_upstream(name: str, base_url: str, headers: dict = None) -> UpstreamClient:
+    """Return the shared client for upstream ``name``, creating it on first use with the UPSTREAM_* settings."""
+    client = _clients.get(name)
+    if client is None:
+        client = _clients[name] = UpstreamClient(
+            name,
+            base_url,
+            headers=headers,
+            max_connections=config.UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=config.UPSTREAM_MAX_KEEPALIVE,
+            keepalive_expiry=config.UPSTREAM_KEEPALIVE_EXPIRY,
+            connect_timeout=config.UPSTREAM_CONNECT_TIMEOUT,
+            read_timeout=config.UPSTREAM_READ_TIMEOUT,
+            retries=config.UPSTREAM_RETRIES,
+            backoff_factor=config.UPSTREAM_BACKOFF,
+            failure_threshold=config.UPSTREAM_BREAKER_THRESHOLD,
+            reset_timeout=config.UPSTREAM_BREAKER_RESET,
+        )
+    return client
+
+
+async def aclose_all():
+    for client in _clients.values():
+        await client.aclose()
+
+
+def prometheus_lines() -> list:
+    """Upstream call outcomes and circuit states in Prometheus text format, for the /metrics collector."""
+    items = sorted(_clients.items())
+    states = ("closed", "half_open", "open")
+    return [
+        "# HELP upstream_requests_total Upstream API calls by outcome (retried counts extra attempts).",
+        "# TYPE upstream_requests_total counter",
+        *(f'upstream_requests_total{{upstream="{n}",outcome="{o}"}} {v}' for n, c in items for o, v in c.counts.items()),
+        "# HELP upstream_circuit_state Circuit breaker state per upstream (1 for the current state).",
+        "# TYPE upstream_circuit_state gauge",
+        *(f'upstream_circuit_state{{upstream="{n}",state="{s}"}} {int(c.breaker.state == s)}' for n, c in items for s in states),
+    ]
@@ -0,0 +1,139 @@
+import asyncio
+from langchain.agents import Tool
+from langchain_core.callbacks import adispatch_custom_event
+from langchain_core.tools import StructuredTool
+
+# JSON-schema types -> converters for the agent's plain-text tool input
+_COERCE = {
+    "integer": int,
+    "number": float,
+    "boolean": lambda v: v.strip().lower() in ("true", "1", "yes"),
+}
+
+
+def display_name(tool_name: str) -> str:
+    """`wikipedia_summary` -> `WikipediaSummary`."""
+    return "".join(part.title() for part in tool_name.split("_"))
+
+
+def parse_tool_input(input_str: str, schema: dict) -> dict:
+    """Map the agent's single text input onto the tool's parameters.
+
+    Single-parameter tools get the text verbatim; multi-parameter tools expect
+    the values separated by spaces, in declaration order.
+    """
+    params = list(schema.get("properties", {}).items())
+    if len(params) == 1:
+        values = [input_str]
+    else:
+        values = input_str.strip().split(maxsplit=len(params) - 1)
+        if len(values) != len(params):
+            names = " ".join(f"<{name}>" for name, _ in params)
+            raise ValueError(f"Input must be {len(params)} values separated by spaces: '{names}'.")
+    return {name: _COERCE.get(prop.get("type"), str)(value) for (name, prop), value in zip(params, values)}
+
+
+def describe(description: str, schema: dict) -> str:
+    params = list(schema.get("properties", {}))
+    if len(params) == 1:
+        return f"{description} Input: the value for '{params[0]}'."
+    return f"{description} Input: values for {', '.join(params)} separated by spaces."
+
+
+def _text_tool_func(client, name: str, schema: dict, shrink):
+    # A closure rather than default arguments: ReAct renders each func's
+    # signature into its prompt template, where a dict default breaks formatting.
+    def func(input_str: str) -> str:
+        return shrink(client.call_tool(name, parse_tool_input(input_str, schema)))
+    return func
+
+
+async def _call_with_progress(client, name: str, arguments: dict):
+    """Call a tool, re-emitting the progress lines it streams as ``tool_progress`` events.
+
+    Updates arrive on the client's worker thread; they are handed over to this
+    loop and dispatched from the tool's own run, so callbacks (e.g. the
+    Streamlit stream) can show partial results while the call is still in flight.
+    """
+    loop = asyncio.get_running_loop()
+    updates = asyncio.Queue()
+
+    def on_progress(update: dict):
+        loop.call_soon_threadsafe(updates.put_nowait, update)
+
+    call = asyncio.ensure_future(client.acall_tool(name, arguments, progress_handler=on_progress))
+    try:
+        while True:
+            update = asyncio.ensure_future(updates.get())
+            await asyncio.wait({call, update}, return_when=asyncio.FIRST_COMPLETED)
+            if not update.done():
+                update.cancel()
+                break
+            await adispatch_custom_event("tool_progress", {"tool": name, **update.result()})
+        while not updates.empty():
+            await adispatch_custom_event("tool_progress", {"tool": name, **updates.get_nowait()})
+    finally:
+        if not call.done():
+            call.cancel()
+    return call.result()
+
+
+def _structured_tool_funcs(client, name: str, shrink):
+    def func(**kwargs) -> str:
+        return shrink(client.call_tool(name, kwargs))
+
+    async def coroutine(**kwargs) -> str:
+        return shrink(await _call_with_progress(client, name, kwargs))
+    return func, coroutine
+
+
+def build_tools(client, catalog: list, observations=None) -> list:
+    """Create one LangChain Tool per entry of the backend's ``GET /tools`` catalogue.
+
+    With an ``ObservationStore``, long results are cut to a preview plus a
+    reference the agent can page through with :func:`recall_tool`.
+    """
+    shrink = observations.shrink if observations else str
+    return [
+        Tool(
+            name=display_name(entry["name"]),
+            func=_text_tool_func(client, entry["name"], entry["parameters"], shrink),
+            description=describe(entry["description"], entry["parameters"]),
+        )
+        for entry in catalog
+    ]
+
+
+def build_structured_tools(client, catalog: list, observations=None) -> list:
+    """Create one multi-argument StructuredTool per backend tool, for native tool calling.
+
+    The model fills in the tool's JSON schema directly, and the async path
+    lets the agent run several calls from one turn concurrently.
+    """
+    shrink = observations.shrink if observations else str
+    tools = []
+    for entry in catalog:
+        func, coroutine = _structured_tool_funcs(client, entry["name"], shrink)
+        tools.append(StructuredTool(
+            name=display_name(entry["name"]),
+            description=entry["description"],
+            args_schema=entry["parameters"],
+            func=func,
+            coroutine=coroutine,
+        ))
+    return tools
+
+
+def recall_tool(observations, structured: bool = False):
+    """Tool for reading the rest of an observation that ``observations`` truncated."""
+    description = "Read more of a truncated tool result, given the ref and offset it mentions."
+    if structured:
+        return StructuredTool.from_function(
+            func=observations.recall, name="RecallObservation", description=description,
+        )
+
+    def func(input_str: str) -> str:
+        ref, _, offset = input_str.strip().partition(" ")
+        return observations.recall(ref, int(offset or 0))
+    return Tool(name="RecallObservation", func=func,
+                description=f"{description} Input: the ref and offset separated by a space.")
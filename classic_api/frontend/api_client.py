@@ -0,0 +1,138 @@
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: the request never reached a healthy worker.
+RETRY_STATUS_CODES = {502, 503, 504}
+# Of those, the ones a proxy only sends without having forwarded the request;
+# a 502 or 504 can come after the backend already ran it.
+UNSENT_STATUS_CODES = {503}
+
+
+class ToolAPIClient:
+    """Shared keep-alive HTTP client for the FastAPI tool backend.
+
+    Wraps a single ``httpx.Client`` so TCP (and optionally HTTP/2) connections
+    are pooled and reused across tool calls, with bounded retries and
+    exponential backoff for transient connection failures.
+    """
+
+    def __init__(self, base_url: str, http2: bool = False, max_connections: int = 20,
+                 max_keepalive_connections: int = 10, keepalive_expiry: float = 30.0,
+                 connect_timeout: float = 5.0, read_timeout: float = 60.0,
+                 retries: int = 2, backoff_factor: float = 0.2):
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        # Learned from list_tools()
+        self._idempotent_tools = set()
+        self._progress_tools = set()
+        self._client = httpx.Client(
+            base_url=base_url,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        )
+
+    def _sleep_before_retry(self, attempt: int):
+        delay = self.backoff_factor * (2 ** attempt)
+        time.sleep(delay + random.uniform(0, delay))
+
+    def request(self, method: str, path: str, stream: bool = False, idempotent: bool = None,
+                **kwargs) -> httpx.Response:
+        """Send a request, retrying connection errors and gateway-style 5xx responses.
+
+        A dropped connection (``RemoteProtocolError``) or a 502/504 may come
+        after the server has run the request, so they are only retried when
+        ``idempotent`` (by default, for GETs); other calls retry connect errors
+        and 503s only. With ``stream=True`` the body is left unread; the caller
+        must close the response.
+        """
+        if idempotent is None:
+            idempotent = method == "GET"
+        retryable = (httpx.ConnectError, httpx.ConnectTimeout)
+        retry_status_codes = UNSENT_STATUS_CODES
+        if idempotent:
+            retryable += (httpx.RemoteProtocolError,)
+            retry_status_codes = RETRY_STATUS_CODES
+        for attempt in range(self.retries + 1):
+            try:
+                response = self._client.send(self._client.build_request(method, path, **kwargs), stream=stream)
+            except retryable as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"{method} {path} failed ({e}), retrying")
+            else:
+                if response.status_code not in retry_status_codes or attempt == self.retries:
+                    return response
+                response.close()
+                logger.warning(f"{method} {path} returned {response.status_code}, retrying")
+            self._sleep_before_retry(attempt)
+
+    def post(self, path: str, payload: dict, idempotent: bool = False) -> httpx.Response:
+        return self.request("POST", path, idempotent=idempotent, json=payload)
+
+    def list_tools(self) -> list:
+        """Fetch the backend's tool catalogue (name, description, JSON parameter schema)."""
+        response = self.request("GET", "/tools")
+        response.raise_for_status()
+        tools = response.json()
+        self._idempotent_tools = {tool["name"] for tool in tools if tool.get("idempotent")}
+        self._progress_tools = {tool["name"] for tool in tools if tool.get("reports_progress")}
+        return tools
+
+    def call_tool(self, tool: str, payload: dict):
+        """Invoke ``/tools/<tool>`` and return its answer."""
+        response = self.post(f"/tools/{tool}", payload, idempotent=tool in self._idempotent_tools)
+        if response.status_code == 429:
+            # Admission control rejected the call; tell the agent rather than retrying into the overload.
+            detail = response.json().get("detail", "tool overloaded")
+            return f"Error: {detail}. Retry after {response.headers.get('Retry-After', '1')}s."
+        return response.json().get("answer", "No answer returned.")
+
+    def call_tool_with_progress(self, tool: str, payload: dict, progress_handler):
+        """Invoke ``tool`` over ``/tools/batch/stream``, passing each progress update it streams to ``progress_handler``.
+
+        ``progress_handler`` gets ``{"progress", "total", "message"}`` dicts, on the calling thread.
+        """
+        response = self.request("POST", "/tools/batch/stream", stream=True, idempotent=tool in self._idempotent_tools,
+                                json=[{"tool": tool, "args": payload}])
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                item = json.loads(line)
+                if "progress" in item:
+                    progress_handler({key: item[key] for key in ("progress", "total", "message")})
+                elif "answer" in item:
+                    return item["answer"]
+                elif "retry_after" in item:
+                    return f"Error: {item['error']}. Retry after {math.ceil(item['retry_after'])}s."
+                else:
+                    return f"Error: {item.get('error', 'tool failed')}"
+        finally:
+            response.close()
+        return "No answer returned."
+
+    async def acall_tool(self, tool: str, payload: dict, progress_handler=None):
+        """Awaitable :meth:`call_tool`; concurrent calls share the connection pool from worker threads.
+
+        With a ``progress_handler``, calls to tools that report progress stream,
+        see :meth:`call_tool_with_progress`; other tools keep the plain endpoint.
+        """
+        if progress_handler is None or tool not in self._progress_tools:
+            return await asyncio.to_thread(self.call_tool, tool, payload)
+        return await asyncio.to_thread(self.call_tool_with_progress, tool, payload, progress_handler)
+
+    def close(self):
+        self._client.close()
@@ -0,0 +1,60 @@
+import secrets
+import threading
+from collections import OrderedDict
+from langchain.memory import ConversationSummaryBufferMemory
+
+
+def build_memory(llm, max_token_limit: int = 2000) -> ConversationSummaryBufferMemory:
+    """Conversation memory with a token budget.
+
+    Recent turns are kept verbatim; once they exceed ``max_token_limit`` the
+    oldest are folded into a rolling summary by ``llm``, so the history sent
+    with each prompt stays bounded however long the session runs.
+    """
+    return ConversationSummaryBufferMemory(
+        llm=llm,
+        max_token_limit=max_token_limit,
+        memory_key="chat_history",
+        return_messages=True,
+    )
+
+
+class ObservationStore:
+    """Bounded LRU of full tool observations, so prompts only carry a preview and an ID.
+
+    Shared by the cached tools of every session; IDs are random, so one
+    session cannot guess another's references.
+    """
+
+    def __init__(self, max_chars: int = 2000, max_entries: int = 256):
+        self.max_chars = max_chars
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # id -> full text
+
+    def shrink(self, text) -> str:
+        """Return ``text`` unchanged if short, else a preview that references the stored original."""
+        text = str(text)
+        if len(text) <= self.max_chars:
+            return text
+        ref = f"obs-{secrets.token_hex(4)}"
+        with self._lock:
+            self._data[ref] = text
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return (f"{text[:self.max_chars]}\n[{len(text) - self.max_chars} more characters truncated; "
+                f"call RecallObservation with ref '{ref}' and offset {self.max_chars} to read on]")
+
+    def recall(self, ref: str, offset: int = 0) -> str:
+        """Return the next ``max_chars`` of a stored observation starting at ``offset``."""
+        with self._lock:
+            text = self._data.get(ref.strip())
+            if text is not None:
+                self._data.move_to_end(ref.strip())
+        if text is None:
+            return f"Error: no stored observation '{ref}' (it may have expired)."
+        end = offset + self.max_chars
+        chunk = text[offset:end]
+        if end < len(text):
+            chunk += f"\n[{len(text) - end} more characters; call again with offset {end}]"
+        return chunk
@@ -1,13 +1,19 @@
-import streamlit as st
-import httpx
 import asyncio
-from langchain.agents import initialize_agent, Tool, AgentType
-from langchain_openai import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
+import streamlit as st
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain.memory import ConversationSummaryBufferMemory
 from langchain.prompts import SystemMessagePromptTemplate
 import datetime
 import markdown
 from config import config
+from api_client import ToolAPIClient
+from agent_tools import build_tools, build_structured_tools, recall_tool
+from memory import ObservationStore, build_memory
+from answer_cache import AnswerCache
+from agent import AGENT_MODES, build_agent, ainvoke_with_memory
+from streaming import StreamlitAgentStream
+from llm_clients import async_http_client
+from styles import CSS
 
 # Set page configuration with a wider layout and custom theme
 st.set_page_config(
@@ -23,285 +29,94 @@ st.set_page_config(
 )
 
 # Force light theme
-st.markdown("""
-    <style>
-        [data-testid="stAppViewContainer"] {
-            background-color: #ffffff;
-        }
-        [data-testid="stSidebar"] {
-            background-color: #f8f9fa;
-        }
-        [data-testid="stToolbar"] {
-            background-color: #ffffff;
-        }
-        .stMarkdown {
-            color: #1f1f1f;
-        }
-        .stButton > button {
-            background-color: #1f77b4;
-            color: #ffffff;
-        }
-        .stTextInput > div > div > input {
-            color: #1f1f1f;
-            background-color: #ffffff;
-        }
-        
-        /* Main container styling */
-        .main {
-            padding: 2rem;
-            background-color: #ffffff;
-        }
-        
-        /* Chat message styling */
-        .chat-message {
-            padding: 1.5rem;
-            border-radius: 0.5rem;
-            margin-bottom: 1rem;
-            position: relative;
-            background-color: #ffffff;
-            border: 1px solid #e1e4e8;
-        }
-        
-        .user-message {
-            background-color: #f0f2f6;
-            color: #1f1f1f;
-        }
-        
-        .agent-message {
-            background-color: #e8f0fe;
-            color: #1f1f1f;
-        }
-        
-        /* Timestamp styling */
-        .timestamp {
-            font-size: 0.8rem;
-            color: #666;
-        }
-        
-        /* Agent reasoning box */
-        .reasoning-box {
-            background-color: #ffffff;
-            border-left: 3px solid #1f77b4;
-            padding: 1rem;
-            margin: 0.5rem 0;
-            color: #1f1f1f;
-        }
-        
-        /* Tool execution box */
-        .tool-box {
-            background-color: #ffffff;
-            border-left: 3px solid #ffc107;
-            padding: 1rem;
-            margin: 0.5rem 0;
-            color: #1f1f1f;
-        }
-        
-        /* Final answer box */
-        .answer-box {
-            background-color: #ffffff;
-            border-left: 3px solid #28a745;
-            padding: 1rem;
-            margin: 0.5rem 0;
-            color: #1f1f1f;
-        }
-        
-        /* Header styling */
-        .header {
-            background-color: #ffffff;
-            padding: 2rem;
-            border-radius: 0.5rem;
-            margin-bottom: 2rem;
-            text-align: center;
-            border: 1px solid #e1e4e8;
-        }
-        
-        .header h1 {
-            color: #1f1f1f;
-            margin-bottom: 0.5rem;
-        }
-        
-        .header p {
-            color: #666;
-        }
-        
-        /* Expander styling */
-        .streamlit-expanderHeader {
-            background-color: #ffffff;
-            color: #1f1f1f;
-        }
-        
-        /* Code blocks */
-        code {
-            color: #1f1f1f;
-            background-color: #f6f8fa;
-        }
-        
-        /* Links */
-        a {
-            color: #1f77b4;
-        }
-        
-        /* Sidebar */
-        [data-testid="stSidebarNav"] {
-            background-color: #f8f9fa;
-        }
-        
-        .sidebar .sidebar-content {
-            background-color: #f8f9fa;
-        }
-        
-        /* Ensure all text is visible */
-        p, h1, h2, h3, h4, h5, h6, span, div {
-            color: #1f1f1f;
-        }
-        
-        /* Make markdown text visible */
-        .element-container {
-            color: #1f1f1f;
-        }
-    </style>
-""", unsafe_allow_html=True)
-
-# Async MCP tool wrappers
-def add_tool(input_str: str) -> str:
-    async def _add():
-        try:
-            a, b = map(int, input_str.strip().split())
-        except Exception:
-            raise ValueError("Input must be two numbers separated by a space, e.g., '10 20'.")
-        async with httpx.AsyncClient() as client:
-            response = await client.post("http://localhost:8000/tools/add", json={"a": a, "b": b})
-            return response.json().get("answer", "No answer returned.")
-    return asyncio.run(_add())
-
-def reverse_string_tool(s: str) -> str:
-    async def _reverse():
-        async with httpx.AsyncClient() as client:
-            response = await client.post("http://localhost:8000/tools/reverse_string", json={"s": s})
-            return response.json().get("answer", "No answer returned.")
-    return asyncio.run(_reverse())
-
-def word_count_tool(s: str) -> str:
-    async def _count():
-        async with httpx.AsyncClient() as client:
-            response = await client.post("http://localhost:8000/tools/word_count", json={"s": s})
-            return response.json().get("answer", "No answer returned.")
-    return asyncio.run(_count())
-
-def wikipedia_summary_tool(query: str) -> str:
-    async def _wiki():
-        async with httpx.AsyncClient() as client:
-            response = await client.post("http://localhost:8000/tools/wikipedia_summary", json={"query": query})
-            return response.json().get("answer", "No answer returned.")
-    return asyncio.run(_wiki())
-
-def web_search_tool(query: str) -> str:
-    async def _web():
-        async with httpx.AsyncClient() as client:
-            response = await client.post("http://localhost:8000/tools/web_search", json={"query": query})
-            return response.json().get("answer", "No answer returned.")
-    return asyncio.run(_web())
-
-def python_exec_tool(code: str) -> str:
-    async def _pyexec():
-        async with httpx.AsyncClient() as client:
-            response = await client.post("http://localhost:8000/tools/python_exec", json={"code": code})
-            print("PYTHON EXEC RESPONSE:", response.text)
-            return response.json().get("answer", "No answer returned.")
-    return asyncio.run(_pyexec())
-
-def greet_tool(name: str) -> str:
-    async def _greet():
-        async with httpx.AsyncClient() as client:
-            response = await client.post("http://localhost:8000/tools/greet", json={"name": name})
-            return response.json().get("answer", "No answer returned.")
-    return asyncio.run(_greet())
-
-def tool1_tool(question: str) -> str:
-    async def _tool1():
-        async with httpx.AsyncClient() as client:
-            response = await client.post("http://localhost:8000/tools/tool1", json={"question": question})
-            return response.json().get("answer", "No answer returned.")
-    return asyncio.run(_tool1())
-
-def tool2_tool(question: str) -> str:
-    async def _tool2():
-        async with httpx.AsyncClient() as client:
-            response = await client.post("http://localhost:8000/tools/tool2", json={"question": question})
-            return response.json().get("answer", "No answer returned.")
-    return asyncio.run(_tool2())
-
-# Define LangChain tools
-tools = [
-    Tool(
-        name="Add",
-        func=add_tool,
-        description="Add two numbers. Input must be two numbers separated by a space, e.g., '10 20'."
-    ),
-    Tool(
-        name="ReverseString",
-        func=reverse_string_tool,
-        description="Reverse a string. Input should be the string to reverse."
-    ),
-    Tool(
-        name="WordCount",
-        func=word_count_tool,
-        description="Count the number of words in a string. Input should be the string."
-    ),
-    Tool(
-        name="WikipediaSummary",
-        func=wikipedia_summary_tool,
-        description="Get a summary for a topic from Wikipedia. Input should be the topic."
-    ),
-    Tool(
-        name="WebSearch",
-        func=web_search_tool,
-        description="Search the web for up-to-date information. Input should be the search query."
-    ),
-    Tool(
-        name="PythonExec",
-        func=python_exec_tool,
-        description="Execute a Python code snippet and return the output. Input should be a valid Python expression, e.g., 'sum([1,2,3])' or 'max(5, 10)'. Only safe built-ins are allowed."
-    ),
-    Tool(
-        name="Greet",
-        func=greet_tool,
-        description="Greet a person by name. Input should be the name."
-    ),
-    Tool(
-        name="Tool1",
-        func=tool1_tool,
-        description="Tool1: Input should be a question."
-    ),
-    Tool(
-        name="Tool2",
-        func=tool2_tool,
-        description="Tool2: Input should be a question."
-    ),
-]
+st.markdown(CSS, unsafe_allow_html=True)
+
+# Tool wrappers sharing one pooled HTTP client
+@st.cache_resource
+def get_api_client() -> ToolAPIClient:
+    """Keep-alive client reused across Streamlit reruns and sessions."""
+    return ToolAPIClient(
+        config.BACKEND_URL,
+        http2=config.HTTP2,
+        max_connections=config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        connect_timeout=config.HTTP_CONNECT_TIMEOUT,
+        read_timeout=config.HTTP_READ_TIMEOUT,
+        retries=config.HTTP_RETRIES,
+        backoff_factor=config.HTTP_BACKOFF_FACTOR,
+    )
 
-# Custom system prompt
-def get_llm():
+@st.cache_resource
+def get_observation_store() -> ObservationStore:
+    """Full text of truncated tool results, shared by the cached tools."""
+    return ObservationStore(max_chars=config.OBSERVATION_MAX_CHARS)
+
+@st.cache_resource
+def get_tools() -> list:
+    """LangChain tools generated from the backend's GET /tools catalogue."""
+    client = get_api_client()
+    observations = get_observation_store()
+    return build_tools(client, client.list_tools(), observations) + [recall_tool(observations)]
+
+@st.cache_resource
+def get_structured_tools() -> list:
+    """Multi-argument tools for the native tool-calling agent."""
+    client = get_api_client()
+    observations = get_observation_store()
+    tools = build_structured_tools(client, client.list_tools(), observations)
+    return tools + [recall_tool(observations, structured=True)]
+
+AGENT_MODE = st.sidebar.radio("Agent mode", AGENT_MODES, index=AGENT_MODES.index(config.AGENT_MODE),
+                              help="tool_calling runs several tool calls from one model turn in parallel")
+
+try:
+    tools = get_tools() if AGENT_MODE == "react" else get_structured_tools()
+except Exception as e:
+    st.error(f"🚨 Could not load tools from {config.BACKEND_URL}: {e}")
+    tools = []
+
+# LLM client and agent executor shared across reruns and sessions. Each question
+# runs on its own event loop, so async HTTP connections are pooled per loop.
+@st.cache_resource
+def get_llm(model: str, streaming: bool) -> ChatOpenAI:
     return ChatOpenAI(
         temperature=0,
-        model=config.OPENAI_MODEL,
-        openai_api_key=config.OPENAI_API_KEY
+        model=model,
+        openai_api_key=config.OPENAI_API_KEY,
+        streaming=streaming,
+        http_async_client=async_http_client(),
     )
 
-# Add conversation memory
-def get_agent():
-    if "memory" not in st.session_state:
-        st.session_state.memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-    llm = get_llm()
-    return initialize_agent(
-        tools,
-        llm,
-        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-        verbose=True,
-        memory=st.session_state.memory,
-        return_intermediate_steps=True,
+@st.cache_resource
+def get_agent(mode: str, model: str, streaming: bool):
+    agent_tools = get_tools() if mode == "react" else get_structured_tools()
+    return build_agent(mode, get_llm(model, streaming), agent_tools)
+
+# Conversation memory is per session and passed to the shared agent on each run
+@st.cache_resource
+def get_answer_cache(model: str):
+    """Final-answer cache shared by all sessions (per model), or None when disabled."""
+    if not config.ANSWER_CACHE:
+        return None
+    embeddings = OpenAIEmbeddings(
+        model=config.EMBEDDING_MODEL, openai_api_key=config.OPENAI_API_KEY, http_async_client=async_http_client(),
+    ) if config.ANSWER_CACHE_SEMANTIC else None
+    return AnswerCache(
+        embeddings,
+        threshold=config.ANSWER_CACHE_THRESHOLD,
+        ttl=config.ANSWER_CACHE_TTL,
+        volatile_tools=config.ANSWER_CACHE_VOLATILE_TOOLS,
+        volatile_ttl=config.ANSWER_CACHE_VOLATILE_TTL,
+        max_entries=config.ANSWER_CACHE_MAX_ENTRIES,
     )
 
+def get_memory() -> ConversationSummaryBufferMemory:
+    if "memory" not in st.session_state:
+        # Summaries use a non-streaming client so they never render as agent output
+        st.session_state.memory = build_memory(get_llm(config.OPENAI_MODEL, False), config.MEMORY_MAX_TOKENS)
+    return st.session_state.memory
+
 # Initialize session state
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
@@ -327,6 +142,11 @@ with st.sidebar:
         if "memory" in st.session_state:
             del st.session_state.memory
         st.rerun()
+    answer_cache = get_answer_cache(config.OPENAI_MODEL)
+    if answer_cache is not None:
+        st.caption(f"Answer cache: {answer_cache.stats()}")
+        if st.button("♻️ Clear Answer Cache", use_container_width=True):
+            answer_cache.invalidate()
 
 # Chat messages display
 for msg in st.session_state.chat_history:
@@ -372,13 +192,18 @@ question = st.text_input(
 )
 
 col1, col2, col3 = st.columns([3, 1, 1])
+# Live agent output goes below the input row rather than into the narrow button column
+live_output = st.container()
 with col2:
     if st.button("🚀 Ask", use_container_width=True) and question.strip():
-        agent = get_agent()
+        agent = get_agent(AGENT_MODE, config.OPENAI_MODEL, config.STREAMING)
+        callbacks = [StreamlitAgentStream(live_output)] if config.STREAMING else []
         with st.spinner("🤔 Thinking..."):
             try:
                 # Execute agent and get result with intermediate steps
-                result = agent.invoke({"input": question})
+                # Async so tool calls requested in the same turn are dispatched concurrently
+                result = asyncio.run(ainvoke_with_memory(
+                    agent, question, get_memory(), callbacks, cache=get_answer_cache(config.OPENAI_MODEL)))
                 
                 # Extract chain of thought from intermediate steps
                 chain_of_thought = []
@@ -0,0 +1,140 @@
+# Light theme and chat styling for streamlit_app.py, defined once per process
+# instead of being rebuilt on every rerun.
+CSS = """
+    <style>
+        [data-testid="stAppViewContainer"] {
+            background-color: #ffffff;
+        }
+        [data-testid="stSidebar"] {
+            background-color: #f8f9fa;
+        }
+        [data-testid="stToolbar"] {
+            background-color: #ffffff;
+        }
+        .stMarkdown {
+            color: #1f1f1f;
+        }
+        .stButton > button {
+            background-color: #1f77b4;
+            color: #ffffff;
+        }
+        .stTextInput > div > div > input {
+            color: #1f1f1f;
+            background-color: #ffffff;
+        }
+        
+        /* Main container styling */
+        .main {
+            padding: 2rem;
+            background-color: #ffffff;
+        }
+        
+        /* Chat message styling */
+        .chat-message {
+            padding: 1.5rem;
+            border-radius: 0.5rem;
+            margin-bottom: 1rem;
+            position: relative;
+            background-color: #ffffff;
+            border: 1px solid #e1e4e8;
+        }
+        
+        .user-message {
+            background-color: #f0f2f6;
+            color: #1f1f1f;
+        }
+        
+        .agent-message {
+            background-color: #e8f0fe;
+            color: #1f1f1f;
+        }
+        
+        /* Timestamp styling */
+        .timestamp {
+            font-size: 0.8rem;
+            color: #666;
+        }
+        
+        /* Agent reasoning box */
+        .reasoning-box {
+            background-color: #ffffff;
+            border-left: 3px solid #1f77b4;
+            padding: 1rem;
+            margin: 0.5rem 0;
+            color: #1f1f1f;
+        }
+        
+        /* Tool execution box */
+        .tool-box {
+            background-color: #ffffff;
+            border-left: 3px solid #ffc107;
+            padding: 1rem;
+            margin: 0.5rem 0;
+            color: #1f1f1f;
+        }
+        
+        /* Final answer box */
+        .answer-box {
+            background-color: #ffffff;
+            border-left: 3px solid #28a745;
+            padding: 1rem;
+            margin: 0.5rem 0;
+            color: #1f1f1f;
+        }
+        
+        /* Header styling */
+        .header {
+            background-color: #ffffff;
+            padding: 2rem;
+            border-radius: 0.5rem;
+            margin-bottom: 2rem;
+            text-align: center;
+            border: 1px solid #e1e4e8;
+        }
+        
+        .header h1 {
+            color: #1f1f1f;
+            margin-bottom: 0.5rem;
+        }
+        
+        .header p {
+            color: #666;
+        }
+        
+        /* Expander styling */
+        .streamlit-expanderHeader {
+            background-color: #ffffff;
+            color: #1f1f1f;
+        }
+        
+        /* Code blocks */
+        code {
+            color: #1f1f1f;
+            background-color: #f6f8fa;
+        }
+        
+        /* Links */
+        a {
+            color: #1f77b4;
+        }
+        
+        /* Sidebar */
+        [data-testid="stSidebarNav"] {
+            background-color: #f8f9fa;
+        }
+        
+        .sidebar .sidebar-content {
+            background-color: #f8f9fa;
+        }
+        
+        /* Ensure all text is visible */
+        p, h1, h2, h3, h4, h5, h6, span, div {
+            color: #1f1f1f;
+        }
+        
+        /* Make markdown text visible */
+        .element-container {
+            color: #1f1f1f;
+        }
+    </style>
+"""
@@ -0,0 +1,223 @@
+import asyncio
+import contextvars
+import ipaddress
+import time
+from collections import OrderedDict, deque
+
+# Caller identity for rate limiting, set per request by the transport.
+_client = contextvars.ContextVar("admission_client", default=None)
+
+# tool name -> ToolLimiter, for tools with a configured concurrency cap
+LIMITERS = {}
+_rate_limiter = None
+_trusted_proxies = []  # ip_network objects
+
+
+class Overloaded(Exception):
+    """A call was rejected by admission control; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ToolLimiter:
+    """Concurrency cap for one tool with a bounded, time-limited wait queue.
+
+    Up to ``limit`` calls run at once and up to ``queue_size`` more wait for a
+    slot, each for at most ``queue_timeout`` seconds. Anything beyond that is
+    rejected immediately rather than queued, so a burst against one slow tool
+    can't pile up unbounded work.
+    """
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.rejected = 0
+        self._waiters = deque()  # futures of queued calls, oldest first
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, tool: str):
+        if self.running < self.limit and not self._waiters:
+            self.running += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            raise Overloaded(f"{tool} is overloaded ({self.limit} running, {len(self._waiters)} queued)")
+        # An explicit waiter rather than wait_for(semaphore.acquire()): before
+        # Python 3.12 that can time out after the acquire succeeded and leak the
+        # slot. Here the timeout and release() both settle the future on the
+        # loop thread, so exactly one of them wins.
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        timer = loop.call_later(self.queue_timeout, self._expire, waiter)
+        try:
+            await waiter
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise Overloaded(f"{tool} is overloaded (no slot within {self.queue_timeout:g}s)") from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self.release()  # handed a slot just as we were cancelled: pass it on
+            raise
+        finally:
+            timer.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _expire(self, waiter):
+        if not waiter.done():
+            waiter.set_exception(asyncio.TimeoutError())
+
+    def release(self):
+        # Hand the slot straight to the oldest live waiter, so `running` is unchanged.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Spend one token; return 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Per-client token buckets, keeping the ``max_clients`` most recently seen."""
+
+    def __init__(self, rate: float, burst: int, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_clients = max_clients
+        self.rejected = 0
+        self._buckets = OrderedDict()  # client -> TokenBucket
+
+    def check(self, client: str):
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        wait = bucket.take()
+        if wait:
+            self.rejected += 1
+            raise Overloaded(f"Rate limit exceeded for {client}", retry_after=wait)
+
+
+def configure(concurrency: dict, queue_size: int = 32, queue_timeout: float = 10.0,
+              rate: float = 0.0, burst: int = 20, trusted_proxies=()):
+    """Set per-tool caps (``{tool: max concurrent calls}``) and the per-client rate (calls/s; 0 disables).
+
+    Tools without a cap are not limited at all, so cheap tools pay nothing.
+    ``trusted_proxies`` lists the addresses or networks allowed to name the
+    client in headers (see :func:`client_identity`).
+    """
+    global _rate_limiter
+    LIMITERS.clear()
+    LIMITERS.update({tool: ToolLimiter(limit, queue_size, queue_timeout) for tool, limit in concurrency.items() if limit > 0})
+    _rate_limiter = RateLimiter(rate, burst) if rate > 0 else None
+    _trusted_proxies[:] = [ipaddress.ip_network(proxy, strict=False) for proxy in trusted_proxies]
+
+
+def _is_trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_proxies)
+
+
+def client_identity(peer: str, headers) -> str:
+    """Rate-limit key for a request that arrived from ``peer``.
+
+    ``X-Client-Id`` and ``X-Forwarded-For`` are set by whoever sends the
+    request, so they are only honoured when ``peer`` is a trusted proxy;
+    otherwise a client could dodge its bucket with a new value per request.
+    """
+    if not _is_trusted(peer):
+        return peer
+    client_id = headers.get("x-client-id")
+    if client_id:
+        return client_id
+    # The nearest hop the trusted proxies didn't add themselves.
+    hops = [hop.strip() for hop in headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop):
+            return hop
+    return peer
+
+
+def set_client(client: str):
+    """Attribute this request's tool calls to ``client``; returns a reset token."""
+    return _client.set(client)
+
+
+def reset_client(token):
+    _client.reset(token)
+
+
+async def rate_limit(spec, kwargs, call_next):
+    """Registry middleware: charge each call to the caller's token bucket.
+
+    Calls made without a client (in-process, stdio) are not rate limited.
+    """
+    client = _client.get()
+    if _rate_limiter is not None and client is not None:
+        _rate_limiter.check(client)
+    return await call_next()
+
+
+async def concurrency_limit(spec, kwargs, call_next):
+    """Registry middleware: hold one of the tool's slots for the duration of the call."""
+    limiter = LIMITERS.get(spec.name)
+    if limiter is None:
+        return await call_next()
+    await limiter.acquire(spec.name)
+    try:
+        return await call_next()
+    finally:
+        limiter.release()
+
+
+def prometheus_lines() -> list:
+    """Admission gauges and rejection counters in Prometheus text format, for the /metrics collector."""
+    items = sorted(LIMITERS.items())
+    return [
+        "# HELP tool_concurrency_limit Maximum concurrent calls allowed per tool.",
+        "# TYPE tool_concurrency_limit gauge",
+        *(f'tool_concurrency_limit{{tool="{t}"}} {l.limit}' for t, l in items),
+        "# HELP tool_queue_depth Calls waiting for a concurrency slot.",
+        "# TYPE tool_queue_depth gauge",
+        *(f'tool_queue_depth{{tool="{t}"}} {l.waiting}' for t, l in items),
+        "# HELP tool_overload_rejections_total Calls rejected because the tool's queue was full or the wait timed out.",
+        "# TYPE tool_overload_rejections_total counter",
+        *(f'tool_overload_rejections_total{{tool="{t}"}} {l.rejected}' for t, l in items),
+        "# HELP rate_limit_rejections_total Calls rejected by the per-client rate limit.",
+        "# TYPE rate_limit_rejections_total counter",
+        f"rate_limit_rejections_total {_rate_limiter.rejected if _rate_limiter else 0}",
+    ]
@@ -0,0 +1,120 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is emitted as a field.
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, plus any `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _RESERVED})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps a record's traceback as its own field for the listener's formatter.
+
+    The stock ``prepare`` formats the traceback into ``msg`` and clears ``exc_info``,
+    so JSON output could never carry it separately.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Format now, on the caller's thread, rather than keep its frames alive in the queue.
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class TruncatingFilter(logging.Filter):
+    """Cap message length so large payloads are never queued or written in full."""
+
+    def __init__(self, max_length: int):
+        super().__init__()
+        self.max_length = max_length
+
+    def filter(self, record):
+        message = record.getMessage()
+        if len(message) > self.max_length:
+            record.msg = f"{message[:self.max_length]}... [truncated {len(message) - self.max_length} chars]"
+            record.args = None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of sub-WARNING records from high-volume loggers."""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates  # logger name -> fraction of records kept
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name)
+        return rate is None or random.random() < rate
+
+
+def parse_sample_rates(value: str) -> dict:
+    """'tools.web_search=0.1,tools.python_exec=0.5' -> {name: rate}."""
+    rates = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, rate = item.split("=", 1)
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def setup_logging(log_dir: str, filename: str, level=logging.INFO, max_bytes: int = 10 * 1024 * 1024,
+                  backup_count: int = 5, json_format: bool = True, max_message_length: int = 2000,
+                  sample_rates: dict = None) -> logging.handlers.QueueListener:
+    """Route all logging through a queue drained by a background listener thread.
+
+    Request handlers only pay for filtering and an in-memory enqueue; formatting,
+    file writes and rotation happen on the listener thread.
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    formatter = JSONFormatter() if json_format else logging.Formatter('%(asctime)s %(levelname)s %(message)s')
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, filename), maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8",
+    )
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+    queue_handler.addFilter(TruncatingFilter(max_message_length))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
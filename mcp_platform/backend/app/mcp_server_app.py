@@ -1,91 +1,203 @@
 import logging
 import os
-import asyncio
-from fastmcp import FastMCP
-
-# Import all tools
-from tools.add import run as add
-from tools.reverse_string import run as reverse_string
-from tools.word_count import run as word_count
-from tools.wikipedia_summary import run as wikipedia_summary
-from tools.web_search import run as web_search
-from tools.python_exec import run as python_exec
-from tools.greet import run as greet
-from tools.tool1 import run as tool1
-from tools.tool2 import run as tool2
-
-# Ensure logs directory exists
-os.makedirs("logs", exist_ok=True)
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)s %(message)s',
-    handlers=[
-        logging.FileHandler("logs/mcp_server.log"),
-        logging.StreamHandler()
-    ]
-)
+from contextlib import asynccontextmanager
+import inspect
+import math
+from fastmcp import FastMCP, Context
+from fastmcp.exceptions import ToolError
+from fastmcp.server.dependencies import get_http_request
+from fastmcp.server.middleware import Middleware
+from starlette.responses import JSONResponse, PlainTextResponse
+
+import registry
+from registry import discover
+import cache
+from cache import cache_stats
+import metrics
+import coalesce
+import admission
+import progress
+import sandbox
+import upstream
+import profiling
+from logging_setup import setup_logging, parse_sample_rates
+from tools.config import config
+
 logger = logging.getLogger(__name__)
 
+# Register every tool discovered in tools/. Argument schemas come from each
+# module's `run` signature; the module itself is imported on first call.
+TOOLS = discover(enabled=config.ENABLED_TOOLS)
+# Names tools were published under before the registry (`<module>_tool`), kept
+# working for existing clients and saved prompts; listed as deprecated.
+LEGACY_TOOL_NAMES = {"wikipedia_tool": "wikipedia_summary"}
+registry.use(metrics.middleware)
+registry.use(admission.rate_limit)
+registry.use(coalesce.middleware)
+# Inside coalescing, so duplicates joining an in-flight call don't take a slot.
+registry.use(admission.concurrency_limit)
+# Innermost: cprofile mode runs sync tools itself, on the worker thread.
+if config.PROFILE_SAMPLE_RATE > 0:
+    registry.use(profiling.middleware)
+admission.configure(
+    config.TOOL_CONCURRENCY,
+    queue_size=config.TOOL_QUEUE_SIZE,
+    queue_timeout=config.TOOL_QUEUE_TIMEOUT,
+    rate=config.RATE_LIMIT_PER_SECOND,
+    burst=config.RATE_LIMIT_BURST,
+    trusted_proxies=config.TRUSTED_PROXIES,
+)
+metrics.register_collector(cache.prometheus_lines)
+metrics.register_collector(coalesce.prometheus_lines)
+metrics.register_collector(admission.prometheus_lines)
+metrics.register_collector(upstream.prometheus_lines)
+metrics.register_collector(profiling.prometheus_lines)
+
+def configure_logging(per_process: bool = False):
+    # Records are enqueued on the request path and written (with size-based
+    # rotation) by a background listener thread. Worker processes each get
+    # their own file, since rotation is not safe across processes.
+    setup_logging(
+        config.LOG_DIR,
+        f"mcp_server.{os.getpid()}.log" if per_process else "mcp_server.log",
+        max_bytes=config.LOG_MAX_BYTES,
+        backup_count=config.LOG_BACKUP_COUNT,
+        json_format=config.LOG_JSON,
+        max_message_length=config.LOG_MAX_MESSAGE_LENGTH,
+        sample_rates=parse_sample_rates(config.LOG_SAMPLE_RATES),
+    )
+
+@asynccontextmanager
+async def lifespan(server):
+    # Start python_exec workers up front so the first call doesn't pay process spawn.
+    if "python_exec" in TOOLS:
+        sandbox.get_pool()
+    try:
+        yield
+    finally:
+        sandbox.shutdown_pool()
+        await upstream.aclose_all()
+        profiling.dump()
+
 # Create FastMCP server instance
-mcp = FastMCP("MCP Demo Server 🚀")
-
-# Register all tools using the @tool decorator pattern
-@mcp.tool
-async def add_tool(a: int, b: int) -> int:
-    """Add two numbers."""
-    return await add(a, b)
-
-@mcp.tool
-async def reverse_string_tool(s: str) -> str:
-    """Reverse a string."""
-    return await reverse_string(s)
-
-@mcp.tool
-async def word_count_tool(s: str) -> int:
-    """Count words in text."""
-    return await word_count(s)
-
-@mcp.tool
-async def wikipedia_tool(query: str) -> str:
-    """Get Wikipedia summary."""
-    return await wikipedia_summary(query)
-
-@mcp.tool
-async def web_search_tool(query: str) -> str:
-    """Search the web."""
-    return await web_search(query)
-
-@mcp.tool
-async def python_exec_tool(code: str) -> str:
-    """Execute Python code."""
-    return await python_exec(code)
-
-@mcp.tool
-async def greet_tool(name: str) -> str:
-    """Greet someone."""
-    return await greet(name)
-
-@mcp.tool
-async def tool1_tool(param: str) -> str:
-    """Tool 1 implementation."""
-    return await tool1(param)
-
-@mcp.tool
-async def tool2_tool(param: str) -> str:
-    """Tool 2 implementation."""
-    return await tool2(param)
+mcp = FastMCP("MCP Demo Server 🚀", lifespan=lifespan)
+
+class PhaseTimingMiddleware(Middleware):
+    """Times each tool call's phases and returns them in the result's ``_meta.timings_ms``.
+
+    JSON-RPC messages are decoded before middleware runs, so there is no
+    separate decode phase: ``validate`` covers dispatch and argument validation.
+    """
+
+    async def on_call_tool(self, context, call_next):
+        trace = profiling.start_trace(MCP_TOOL_NAMES.get(context.message.name, context.message.name))
+        token = profiling.use_trace(trace)
+        try:
+            result = await call_next(context)
+        finally:
+            profiling.reset_trace(token)
+        trace.mark("encode")
+        trace.finish()
+        if trace:
+            result.meta = {**(result.meta or {}), "timings_ms": trace.timings_ms()}
+        return result
+
+if profiling.phases_enabled():
+    mcp.add_middleware(PhaseTimingMiddleware())
+
+def _client_id():
+    # Rate limits are per client: the peer address, or the client a trusted proxy names.
+    # Calls without an HTTP request (stdio, in-memory) are not attributed.
+    try:
+        request = get_http_request()
+    except RuntimeError:
+        return None
+    return admission.client_identity(request.client.host if request.client else "unknown", request.headers)
+
+def _make_tool(spec, name: str):
+    async def tool(ctx: Context, **kwargs):
+        trace = profiling.current_trace()
+        trace.mark("validate")
+        # Tools report partial results via progress.report(); forward them as
+        # MCP progress notifications (delivered when the client sent a progress token).
+        token = progress.set_reporter(ctx.report_progress)
+        client_token = admission.set_client(_client_id())
+        try:
+            answer = await spec.invoke(**kwargs)
+            trace.mark("execute")
+            return answer
+        except admission.Overloaded as e:
+            # MCP has no 429; surface a tool error with the same retry hint.
+            raise ToolError(f"Overloaded: {e}. Retry after {math.ceil(e.retry_after)}s.") from None
+        finally:
+            admission.reset_client(client_token)
+            progress.reset_reporter(token)
+    tool.__name__ = tool.__qualname__ = name
+    tool.__doc__ = spec.description
+    # FastMCP injects the Context parameter and leaves it out of the input schema.
+    ctx_param = inspect.Parameter("ctx", inspect.Parameter.KEYWORD_ONLY, annotation=Context)
+    tool.__signature__ = spec.signature.replace(
+        parameters=[*spec.signature.parameters.values(), ctx_param]
+    )
+    tool.__annotations__ = {**spec.annotations, "ctx": Context}
+    return tool
+
+MCP_TOOL_NAMES = {}  # MCP tool name -> registry tool name
+for _spec in TOOLS.values():
+    MCP_TOOL_NAMES[f"{_spec.name}_tool"] = _spec.name
+    mcp.tool(_make_tool(_spec, f"{_spec.name}_tool"))
+for _legacy, _name in LEGACY_TOOL_NAMES.items():
+    if _name in TOOLS:
+        MCP_TOOL_NAMES[_legacy] = _name
+        mcp.tool(
+            _make_tool(TOOLS[_name], _legacy),
+            description=f"Deprecated alias of {_name}_tool. {TOOLS[_name].description}",
+            meta={"deprecated": True},
+        )
+
+@mcp.custom_route("/cache/stats", methods=["GET"])
+async def cache_stats_endpoint(request):
+    """Hit/miss/coalesced counters for the external-lookup result caches."""
+    return JSONResponse(await cache_stats())
+
+@mcp.custom_route("/profiles", methods=["GET"])
+async def profiles_endpoint(request):
+    """Profiling mode, sample rate and per-tool sample counts (see PROFILE_SAMPLE_RATE)."""
+    return JSONResponse(profiling.summary())
+
+@mcp.custom_route("/profiles/{tool}", methods=["GET"])
+async def tool_profile_endpoint(request):
+    """Collapsed stacks sampled from a tool's calls, ready for flamegraph.pl or speedscope."""
+    return PlainTextResponse(profiling.collapsed(request.path_params["tool"]))
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request):
+    """Per-tool call/error counters, in-flight gauges and latency histograms (Prometheus format)."""
+    return PlainTextResponse(await metrics.render(), media_type="text/plain; version=0.0.4")
+
+def use_stateless_http(workers: int) -> bool:
+    # Stateful sessions live in one process's memory, so requests for a session
+    # must keep reaching that process; workers sharing a port can't guarantee it.
+    if config.MCP_STATELESS_HTTP == "auto":
+        return workers > 1
+    return config.MCP_STATELESS_HTTP == "true"
+
+def create_app():
+    """ASGI app factory, called once in each uvicorn worker process (see serve.py)."""
+    configure_logging(per_process=config.MCP_WORKERS > 1)
+    return mcp.http_app(path=config.MCP_PATH, stateless_http=use_stateless_http(config.MCP_WORKERS))
 
 if __name__ == "__main__":
+    configure_logging()
     logger.info("Starting MCP server...")
     try:
-        # Run with streamable-http transport on port 8000
+        # Run with streamable-http transport in a single process; use serve.py for multiple workers
         mcp.run(
             transport="streamable-http",
-            host="0.0.0.0",
-            port=8000,
-            path="/mcp"  # Optional: specify the endpoint path
+            host=config.MCP_HOST,
+            port=config.MCP_PORT,
+            path=config.MCP_PATH,
+            stateless_http=use_stateless_http(1),
         )
     except Exception as e:
         logger.exception(f"MCP server failed to start: {e}") 
\ No newline at end of file
@@ -0,0 +1,122 @@
+import inspect
+import time
+from bisect import bisect_left
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class ToolMetrics:
+    """Counters, in-flight gauge and pre-bucketed latency histogram for one tool.
+
+    Updated only from the event loop thread, so plain integer increments are
+    safe without locks and recording a call costs one bisect and a few adds.
+    """
+
+    __slots__ = ("calls", "errors", "in_flight", "latency_sum", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a latency quantile by linear interpolation within its bucket."""
+        total = sum(self.buckets)
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            if seen + count >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                if i == len(LATENCY_BUCKETS):
+                    return lower
+                return lower + (LATENCY_BUCKETS[i] - lower) * ((rank - seen) / count)
+            seen += count
+        return LATENCY_BUCKETS[-1]
+
+
+TOOL_METRICS = {}
+_collectors = []
+
+
+def get_metrics(tool: str) -> ToolMetrics:
+    metrics = TOOL_METRICS.get(tool)
+    if metrics is None:
+        metrics = TOOL_METRICS[tool] = ToolMetrics()
+    return metrics
+
+
+def register_collector(collector):
+    """Add a callable (or coroutine function) returning extra Prometheus exposition lines for /metrics."""
+    _collectors.append(collector)
+
+
+async def middleware(spec, kwargs, call_next):
+    """Registry middleware recording per-tool calls, errors, in-flight and latency."""
+    metrics = get_metrics(spec.name)
+    metrics.in_flight += 1
+    start = time.perf_counter()
+    try:
+        result = await call_next()
+    except BaseException:
+        metrics.errors += 1
+        raise
+    else:
+        # Tools report handled failures as "Error: ..." strings rather than raising.
+        if isinstance(result, str) and result.startswith("Error:"):
+            metrics.errors += 1
+        return result
+    finally:
+        metrics.in_flight -= 1
+        metrics.calls += 1
+        metrics.observe(time.perf_counter() - start)
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+async def render() -> str:
+    """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+    items = sorted(TOOL_METRICS.items())
+    lines = [
+        "# HELP tool_calls_total Tool invocations.",
+        "# TYPE tool_calls_total counter",
+        *(f'tool_calls_total{{tool="{_label(t)}"}} {m.calls}' for t, m in items),
+        "# HELP tool_errors_total Tool invocations that raised or returned an error.",
+        "# TYPE tool_errors_total counter",
+        *(f'tool_errors_total{{tool="{_label(t)}"}} {m.errors}' for t, m in items),
+        "# HELP tool_in_flight Tool invocations currently running.",
+        "# TYPE tool_in_flight gauge",
+        *(f'tool_in_flight{{tool="{_label(t)}"}} {m.in_flight}' for t, m in items),
+        "# HELP tool_latency_seconds Tool invocation latency.",
+        "# TYPE tool_latency_seconds histogram",
+    ]
+    for tool, m in items:
+        label = _label(tool)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), m.buckets):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'tool_latency_seconds_bucket{{tool="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'tool_latency_seconds_sum{{tool="{label}"}} {m.latency_sum}')
+        lines.append(f'tool_latency_seconds_count{{tool="{label}"}} {cumulative}')
+    lines += [
+        "# HELP tool_latency_quantile_seconds Latency quantiles estimated from the histogram buckets.",
+        "# TYPE tool_latency_quantile_seconds gauge",
+    ]
+    for tool, m in items:
+        for q in QUANTILES:
+            lines.append(f'tool_latency_quantile_seconds{{tool="{_label(tool)}",quantile="{q}"}} {m.quantile(q):.6f}')
+    for collector in _collectors:
+        lines.extend(await collector() if inspect.iscoroutinefunction(collector) else collector())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,318 @@
+import asyncio
+import contextvars
+import cProfile
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from tools.config import config
+
+logger = logging.getLogger(__name__)
+
+PHASE_STATS = {}  # (tool, phase) -> [calls, seconds]
+STACKS = {}  # tool -> Counter of collapsed stack -> samples (sampling mode)
+PSTATS = {}  # tool -> pstats.Stats aggregated over profiled calls (cprofile mode)
+PROFILED_CALLS = Counter()  # tool -> calls profiled in either mode
+_lock = threading.Lock()
+_trace = contextvars.ContextVar("call_trace", default=None)
+_sampler = None
+_cprofile_busy = False
+
+
+def phases_enabled() -> bool:
+    return config.PROFILE_PHASES or config.PROFILE_SAMPLE_RATE > 0
+
+
+# --- Per-phase timings ---
+
+class CallTrace:
+    """Wall-clock time one tool call spends in each phase, from its start to each :meth:`mark`."""
+
+    __slots__ = ("tool", "phases", "_last")
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.phases = {}
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str):
+        """End ``phase`` now; the time since the previous mark is attributed to it."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def finish(self):
+        with _lock:
+            for phase, seconds in self.phases.items():
+                stats = PHASE_STATS.setdefault((self.tool, phase), [0, 0.0])
+                stats[0] += 1
+                stats[1] += seconds
+
+    def timings_ms(self) -> dict:
+        return {phase: round(seconds * 1000, 3) for phase, seconds in self.phases.items()}
+
+    def server_timing(self) -> str:
+        """The timings as an HTTP ``Server-Timing`` header value."""
+        return ", ".join(f"{phase};dur={ms}" for phase, ms in self.timings_ms().items())
+
+
+class _NullTrace:
+    """Stand-in when phase timing is off, so call sites needn't check."""
+
+    def __bool__(self):
+        return False
+
+    def mark(self, phase: str):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+def start_trace(tool: str):
+    """Start timing a call to ``tool``; a no-op trace unless profiling is enabled."""
+    return CallTrace(tool) if phases_enabled() else NULL_TRACE
+
+
+def use_trace(trace):
+    """Make ``trace`` the current call's trace (for code the transport calls into); returns a reset token."""
+    return _trace.set(trace)
+
+
+def reset_trace(token):
+    _trace.reset(token)
+
+
+def current_trace():
+    return _trace.get() or NULL_TRACE
+
+
+# --- Sampled profiling ---
+
+def _label(code) -> str:
+    # co_qualname is new in Python 3.11.
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _frames_outward(frame) -> list:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    return frames
+
+
+def _await_chain(coro) -> list:
+    """Frames of a suspended coroutine and everything it is awaiting, outermost first."""
+    frames = []
+    while coro is not None:
+        if isinstance(coro, asyncio.Task):
+            coro = coro.get_coro()
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+class _ProfiledCall:
+    __slots__ = ("tool", "coro", "code", "loop_thread")
+
+    def __init__(self, tool: str, coro, code, loop_thread: int):
+        self.tool = tool
+        self.coro = coro  # the rest of the call; its frame roots the call's stacks
+        self.code = code  # the tool's `run`, to find it on worker threads
+        self.loop_thread = loop_thread
+
+
+class StackSampler:
+    """Background thread sampling the stacks of in-flight profiled calls every ``interval`` seconds.
+
+    Each sample is attributed to one call: its stack on the event loop thread
+    if it is running there, else the worker thread running the tool's
+    ``run`` (sync tools), else the chain of awaits it is suspended in
+    (ending in ``[await]``). Samples therefore measure wall-clock time,
+    including time spent waiting on upstream APIs. Concurrent calls of the
+    same sync tool can't be told apart on worker threads.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._calls = set()
+        self._calls_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def add(self, call: _ProfiledCall):
+        with self._calls_lock:
+            self._calls.add(call)
+        self._wakeup.set()
+
+    def remove(self, call: _ProfiledCall):
+        with self._calls_lock:
+            self._calls.discard(call)
+
+    def _run(self):
+        while True:
+            if not self._calls:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            time.sleep(self.interval)
+            with self._calls_lock:
+                calls = list(self._calls)
+            frames = sys._current_frames()
+            claimed = {threading.get_ident()}
+            for call in calls:
+                try:
+                    stack = self._stack_of(call, frames, claimed)
+                except Exception:
+                    # Usually the call moved on while we were walking it.
+                    logger.debug(f"Dropped a stack sample of {call.tool}", exc_info=True)
+                    continue
+                if stack:
+                    with _lock:
+                        STACKS.setdefault(call.tool, Counter())[stack] += 1
+
+    def _stack_of(self, call: _ProfiledCall, frames: dict, claimed: set):
+        root = call.coro.cr_frame
+        if root is None:
+            return None
+        loop_stack = _frames_outward(frames.get(call.loop_thread))
+        if root in loop_stack:
+            stack = list(reversed(loop_stack[:loop_stack.index(root) + 1]))
+        else:
+            stack = _await_chain(call.coro)
+            for thread_id, frame in frames.items():
+                if thread_id in claimed or thread_id == call.loop_thread:
+                    continue
+                worker_stack = _frames_outward(frame)
+                codes = [f.f_code for f in worker_stack]
+                if call.code in codes:
+                    claimed.add(thread_id)
+                    stack += list(reversed(worker_stack[:codes.index(call.code) + 1]))
+                    break
+            else:
+                stack.append(None)
+        return ";".join([call.tool] + ["[await]" if f is None else _label(f.f_code) for f in stack])
+
+
+def _get_sampler() -> StackSampler:
+    global _sampler
+    if _sampler is None:
+        _sampler = StackSampler(config.PROFILE_INTERVAL)
+    return _sampler
+
+
+async def _profile_sampling(spec, call_next):
+    coro = call_next()
+    call = _ProfiledCall(spec.name, coro, getattr(spec.load(), "__code__", None), threading.get_ident())
+    sampler = _get_sampler()
+    sampler.add(call)
+    try:
+        return await coro
+    finally:
+        sampler.remove(call)
+        with _lock:
+            PROFILED_CALLS[spec.name] += 1
+
+
+async def _profile_cprofile(spec, kwargs: dict, call_next):
+    # One call at a time: an async tool is profiled on the event loop thread,
+    # so its stats also include other coroutines that run while it is suspended.
+    global _cprofile_busy
+    if _cprofile_busy:
+        return await call_next()
+    _cprofile_busy = True
+    profiler = cProfile.Profile()
+    try:
+        if spec.is_async:
+            profiler.enable()
+            try:
+                return await call_next()
+            finally:
+                profiler.disable()
+        # cProfile only traces the thread that enables it, and sync tools run on
+        # a worker thread, so profile them there. This stands in for
+        # spec.execute(), which is why this middleware is registered innermost.
+        run = spec.load()
+        return await asyncio.get_event_loop().run_in_executor(
+            None, lambda: profiler.runcall(run, **kwargs))
+    finally:
+        _cprofile_busy = False
+        with _lock:
+            PROFILED_CALLS[spec.name] += 1
+            if spec.name in PSTATS:
+                PSTATS[spec.name].add(profiler)
+            else:
+                PSTATS[spec.name] = pstats.Stats(profiler)
+
+
+async def middleware(spec, kwargs, call_next):
+    """Registry middleware: profile a ``PROFILE_SAMPLE_RATE`` fraction of tool calls."""
+    if random.random() >= config.PROFILE_SAMPLE_RATE:
+        return await call_next()
+    if config.PROFILE_MODE == "cprofile":
+        return await _profile_cprofile(spec, kwargs, call_next)
+    return await _profile_sampling(spec, call_next)
+
+
+# --- Output ---
+
+def collapsed(tool: str) -> str:
+    """Samples for ``tool`` in collapsed-stack format (``frame;frame;... count``), for flamegraph tools."""
+    with _lock:
+        stacks = sorted(STACKS.get(tool, {}).items())
+    return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+
+def summary() -> dict:
+    with _lock:
+        return {
+            "mode": config.PROFILE_MODE,
+            "sample_rate": config.PROFILE_SAMPLE_RATE,
+            "samples": {tool: sum(stacks.values()) for tool, stacks in STACKS.items()},
+            "profiled_calls": dict(PROFILED_CALLS),
+        }
+
+
+def dump(directory: str = None):
+    """Write each tool's collapsed stacks (``<tool>.<pid>.collapsed``) or pstats (``<tool>.<pid>.prof``)."""
+    directory = directory or config.PROFILE_DIR
+    with _lock:
+        tools = set(STACKS) | set(PSTATS)
+    if not tools:
+        return
+    os.makedirs(directory, exist_ok=True)
+    pid = os.getpid()
+    for tool in tools:
+        text = collapsed(tool)
+        if text:
+            with open(os.path.join(directory, f"{tool}.{pid}.collapsed"), "w") as f:
+                f.write(text)
+        with _lock:
+            stats = PSTATS.get(tool)
+            if stats is not None:
+                stats.dump_stats(os.path.join(directory, f"{tool}.{pid}.prof"))
+    logger.info(f"Wrote profiles for {sorted(tools)} to {directory}")
+
+
+def prometheus_lines() -> list:
+    """Per-phase call timings in Prometheus text format, for the /metrics collector."""
+    with _lock:
+        items = sorted((key, list(value)) for key, value in PHASE_STATS.items())
+    return [
+        "# HELP tool_phase_seconds Time tool calls spend decoding, validating, executing and encoding.",
+        "# TYPE tool_phase_seconds summary",
+        *(f'tool_phase_seconds_sum{{tool="{t}",phase="{p}"}} {seconds}' for (t, p), (_, seconds) in items),
+        *(f'tool_phase_seconds_count{{tool="{t}",phase="{p}"}} {calls}' for (t, p), (calls, _) in items),
+    ]
@@ -0,0 +1,164 @@
+import ast
+import asyncio
+import importlib
+import importlib.util
+import inspect
+import logging
+import pkgutil
+import typing
+from pydantic import create_model
+
+logger = logging.getLogger(__name__)
+
+TOOLS_PACKAGE = "tools"
+
+# Cross-cutting layers (metrics, limits, ...) applied to every tool call, outermost first.
+_middleware = []
+
+
+def use(middleware):
+    """Register ``middleware(spec, kwargs, call_next)`` around every tool invocation.
+
+    ``call_next()`` runs the rest of the chain and returns the tool's result.
+    """
+    _middleware.append(middleware)
+
+
+async def _call_chain(spec, kwargs: dict, index: int = 0):
+    if index == len(_middleware):
+        return await spec.execute(**kwargs)
+    return await _middleware[index](spec, kwargs, lambda: _call_chain(spec, kwargs, index + 1))
+
+
+# Names an annotation in a tool's `run` signature may refer to.
+_ANNOTATION_NAMESPACE = {
+    "__builtins__": {},
+    "int": int, "float": float, "str": str, "bool": bool, "bytes": bytes,
+    "dict": dict, "list": list, "tuple": tuple, "set": set, "None": None,
+    **{name: getattr(typing, name) for name in ("Any", "Optional", "Union", "List", "Dict", "Tuple", "Set", "Literal")},
+}
+
+
+def _eval_annotation(node):
+    if node is None:
+        return typing.Any
+    try:
+        return eval(ast.unparse(node), dict(_ANNOTATION_NAMESPACE))
+    except Exception:
+        return typing.Any
+
+
+class ToolSpec:
+    """A tool discovered in the tools package.
+
+    Everything needed to expose the tool (name, description, parameters) is
+    read from the module source, so the module itself — and heavy imports
+    such as tavily or wikipedia — is only loaded on the first call.
+    """
+
+    def __init__(self, name: str, module: str, description: str, params: list,
+                 returns, is_async: bool, meta: dict, run=None):
+        self.name = name
+        self.module = module
+        self.description = description
+        self.params = params  # [(name, annotation, default or inspect.Parameter.empty)]
+        self.returns = returns
+        self.is_async = is_async
+        self.meta = meta
+        self._run = run  # given for tools defined in code rather than discovered
+        fields = {
+            pname: (annotation, ... if default is inspect.Parameter.empty else default)
+            for pname, annotation, default in params
+        }
+        camel = "".join(part.title() for part in name.split("_"))
+        self.request_model = create_model(f"{camel}Request", **fields)
+
+    @property
+    def signature(self) -> inspect.Signature:
+        return inspect.Signature(
+            [inspect.Parameter(pname, inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=annotation, default=default)
+             for pname, annotation, default in self.params],
+            return_annotation=self.returns,
+        )
+
+    @property
+    def annotations(self) -> dict:
+        return {**{pname: annotation for pname, annotation, _ in self.params}, "return": self.returns}
+
+    def parameters_schema(self) -> dict:
+        model = self.request_model
+        return model.model_json_schema() if hasattr(model, "model_json_schema") else model.schema()
+
+    def load(self):
+        if self._run is None:
+            logger.info(f"Loading tool module {self.module}")
+            self._run = importlib.import_module(self.module).run
+        return self._run
+
+    async def invoke(self, **kwargs):
+        """Call the tool through the registered middleware chain."""
+        return await _call_chain(self, kwargs)
+
+    async def execute(self, **kwargs):
+        """Call the tool directly, bypassing middleware."""
+        run = self.load()
+        if self.is_async:
+            return await run(**kwargs)
+        # Sync tools run in the default threadpool so they don't block the event loop.
+        return await asyncio.get_event_loop().run_in_executor(None, lambda: run(**kwargs))
+
+
+def _parse_tool(name: str, module: str, path: str):
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    run_def = None
+    meta = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "run":
+            run_def = node
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                meta[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass
+    if run_def is None:
+        return None
+
+    args = run_def.args
+    positional = args.posonlyargs + args.args
+    defaults = [inspect.Parameter.empty] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    params = []
+    for arg, default in zip(positional + args.kwonlyargs, defaults + list(args.kw_defaults)):
+        if default is None:  # kw-only arg without a default
+            default = inspect.Parameter.empty
+        elif default is not inspect.Parameter.empty:
+            default = ast.literal_eval(default)
+        params.append((arg.arg, _eval_annotation(arg.annotation), default))
+
+    return ToolSpec(
+        name=name,
+        module=module,
+        description=ast.get_docstring(run_def) or name.replace("_", " ").capitalize(),
+        params=params,
+        returns=_eval_annotation(run_def.returns),
+        is_async=isinstance(run_def, ast.AsyncFunctionDef),
+        meta=meta,
+    )
+
+
+def discover(package: str = TOOLS_PACKAGE, enabled=None) -> dict:
+    """Scan ``package`` for modules defining ``run`` and return {tool name: ToolSpec}.
+
+    Modules are parsed, not imported. ``enabled`` optionally restricts the
+    result to the given tool names.
+    """
+    locations = importlib.util.find_spec(package).submodule_search_locations
+    tools = {}
+    for info in sorted(pkgutil.iter_modules(locations), key=lambda m: m.name):
+        if info.ispkg or info.name.startswith("_") or (enabled and info.name not in enabled):
+            continue
+        module = f"{package}.{info.name}"
+        spec = _parse_tool(info.name, module, importlib.util.find_spec(module).origin)
+        if spec is not None:
+            tools[info.name] = spec
+    return tools
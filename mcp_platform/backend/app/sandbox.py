@@ -0,0 +1,269 @@
+import ast
+import asyncio
+import builtins
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import resource
+import signal
+import types
+from collections import OrderedDict
+from tools.config import config
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_BUILTINS = ('abs', 'min', 'max', 'sum', 'len', 'range')
+
+# Built once per process and shared read-only by every evaluation.
+SAFE_BUILTINS = types.MappingProxyType({k: getattr(builtins, k) for k in ALLOWED_BUILTINS})
+
+
+class SandboxError(Exception):
+    pass
+
+
+class LRU:
+    """Minimal bounded mapping that evicts the least recently used key.
+
+    With ``max_chars``, values are strings and their total length is bounded too.
+    """
+
+    def __init__(self, max_entries: int, max_chars: int = 0):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.chars = 0
+        self._data = OrderedDict()
+
+    def _size(self, value) -> int:
+        return len(value) if self.max_chars else 0
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def set(self, key, value):
+        if key in self._data:
+            self.chars -= self._size(self._data[key])
+        self._data[key] = value
+        self._data.move_to_end(key)
+        self.chars += self._size(value)
+        while len(self._data) > self.max_entries or (self.max_chars and self.chars > self.max_chars):
+            _, evicted = self._data.popitem(last=False)
+            self.chars -= self._size(evicted)
+
+    def __len__(self):
+        return len(self._data)
+
+
+def validate(code: str) -> bool:
+    """Parse ``code`` as a single expression and reject dunder access.
+
+    Returns whether the expression is pure — it only calls the allowed
+    builtins and touches no attributes — so its result can be memoized.
+    """
+    try:
+        tree = ast.parse(code, mode="eval")
+    except SyntaxError as e:
+        raise SandboxError(f"invalid expression: {e.msg}")
+    pure = True
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute):
+            if node.attr.startswith("_"):
+                raise SandboxError(f"access to '{node.attr}' is not allowed")
+            pure = False
+        elif isinstance(node, ast.Name) and node.id.startswith("__"):
+            raise SandboxError(f"access to '{node.id}' is not allowed")
+        elif isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in ALLOWED_BUILTINS):
+            pure = False
+    return pure
+
+
+def _worker_main(conn, cpu_seconds: float, memory_bytes: int, code_cache_size: int):
+    """Evaluation loop run inside each sandbox process."""
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    _, cpu_hard = resource.getrlimit(resource.RLIMIT_CPU)
+    compiled = LRU(code_cache_size)
+    while True:
+        try:
+            request_id, key, code = conn.recv()
+        except EOFError:
+            return
+        # RLIMIT_CPU is cumulative for the process, so re-arm it relative to the time used so far.
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        resource.setrlimit(resource.RLIMIT_CPU, (int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1, cpu_hard))
+        try:
+            code_obj = compiled.get(key)
+            if code_obj is None:
+                code_obj = compile(code, "<python_exec>", "eval")
+                compiled.set(key, code_obj)
+            conn.send((request_id, True, str(eval(code_obj, {"__builtins__": SAFE_BUILTINS}))))
+        except MemoryError:
+            conn.send((request_id, False, "memory limit exceeded"))
+        except Exception as e:
+            conn.send((request_id, False, str(e)))
+
+
+class _Worker:
+    def __init__(self, ctx, cpu_seconds: float, memory_bytes: int, code_cache_size: int):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, cpu_seconds, memory_bytes, code_cache_size),
+            daemon=True, name="python-exec-sandbox",
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self):
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+
+class SandboxPool:
+    """Pre-started worker processes that evaluate python_exec expressions.
+
+    Each evaluation runs in a separate process under CPU-time and address-space
+    rlimits plus a wall-clock timeout, so a runaway expression only costs one
+    worker (which is killed and replaced) instead of stalling the server's
+    event loop. Workers are recycled after ``max_tasks_per_worker`` calls.
+
+    Expressions are validated once in the parent and identified by a source
+    hash; workers keep an LRU of compiled code objects under that hash, and
+    results of pure expressions are optionally memoized in the parent so a
+    repeat never leaves the event loop. Only results up to ``result_max_chars``
+    are memoized, within ``result_cache_max_chars`` in total. Each request carries an id the worker
+    echoes back, so only the reply to that request is returned or memoized.
+    """
+
+    def __init__(self, size: int, cpu_seconds: float, wall_timeout: float, memory_mb: int,
+                 max_tasks_per_worker: int, code_cache_size: int = 256, result_cache_size: int = 0,
+                 result_max_chars: int = 65536, result_cache_max_chars: int = 16 * 1024 * 1024):
+        self.size = size
+        self.cpu_seconds = cpu_seconds
+        self.wall_timeout = wall_timeout
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.code_cache_size = code_cache_size
+        self._validated = LRU(code_cache_size)  # source hash -> is pure
+        self.result_max_chars = result_max_chars
+        self._results = LRU(result_cache_size, max_chars=result_cache_max_chars) if result_cache_size else None
+        # spawn, not fork: forking a server with live threads and sockets is unsafe.
+        self._ctx = multiprocessing.get_context("spawn")
+        self._request_ids = itertools.count()
+        self._idle = None
+        self._workers = [self._spawn() for _ in range(size)]
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.cpu_seconds, self.memory_bytes, self.code_cache_size)
+
+    def _idle_queue(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for worker in self._workers:
+                self._idle.put_nowait(worker)
+        return self._idle
+
+    async def _recv(self, conn):
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_reader(conn.fileno(), lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, self.wall_timeout)
+        finally:
+            loop.remove_reader(conn.fileno())
+        return conn.recv()
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.stop()
+        new_worker = self._spawn()
+        self._workers[self._workers.index(worker)] = new_worker
+        return new_worker
+
+    async def evaluate(self, code: str) -> str:
+        """Evaluate ``code`` in a sandbox worker; raises SandboxError on failure."""
+        key = hashlib.blake2b(code.encode(), digest_size=16).hexdigest()
+        pure = self._validated.get(key)
+        if pure is None:
+            pure = validate(code)
+            self._validated.set(key, pure)
+        if pure and self._results is not None:
+            result = self._results.get(key)
+            if result is not None:
+                return result
+        result = await self._execute(key, code)
+        if pure and self._results is not None and len(result) <= self.result_max_chars:
+            self._results.set(key, result)
+        return result
+
+    async def _execute(self, key: str, code: str) -> str:
+        idle = self._idle_queue()
+        worker = await idle.get()
+        try:
+            if not worker.process.is_alive():
+                worker = self._replace(worker)
+            request_id = next(self._request_ids)
+            worker.conn.send((request_id, key, code))
+            worker.tasks += 1
+            try:
+                reply_id, ok, value = await self._recv(worker.conn)
+            except asyncio.TimeoutError:
+                worker = self._replace(worker)
+                raise SandboxError(f"wall-clock limit of {self.wall_timeout}s exceeded")
+            except (EOFError, OSError):
+                worker.process.join(timeout=1)
+                died_of_cpu = worker.process.exitcode == -signal.SIGXCPU
+                worker = self._replace(worker)
+                raise SandboxError("CPU time limit exceeded" if died_of_cpu else "sandbox worker crashed")
+            except BaseException:
+                # Cancelled mid-evaluation: the worker is still busy, and its
+                # late reply would be read by the next caller.
+                worker = self._replace(worker)
+                raise
+            if reply_id != request_id:
+                # A reply to some earlier request: this worker can't be trusted,
+                # and the value must not be returned or memoized.
+                worker = self._replace(worker)
+                raise SandboxError("sandbox worker out of sync")
+            if worker.tasks >= self.max_tasks_per_worker:
+                worker = self._replace(worker)
+            if not ok:
+                raise SandboxError(value)
+            return value
+        finally:
+            idle.put_nowait(worker)
+
+    def close(self):
+        for worker in self._workers:
+            worker.stop()
+
+
+_pool = None
+
+
+def get_pool() -> SandboxPool:
+    global _pool
+    if _pool is None:
+        _pool = SandboxPool(
+            size=config.PYTHON_EXEC_WORKERS,
+            cpu_seconds=config.PYTHON_EXEC_CPU_SECONDS,
+            wall_timeout=config.PYTHON_EXEC_TIMEOUT,
+            memory_mb=config.PYTHON_EXEC_MEMORY_MB,
+            max_tasks_per_worker=config.PYTHON_EXEC_MAX_TASKS_PER_WORKER,
+            code_cache_size=config.PYTHON_EXEC_CODE_CACHE_SIZE,
+            result_cache_size=config.PYTHON_EXEC_RESULT_CACHE_SIZE,
+            result_max_chars=config.PYTHON_EXEC_RESULT_MAX_CHARS,
+            result_cache_max_chars=config.PYTHON_EXEC_RESULT_CACHE_MAX_CHARS,
+        )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
@@ -0,0 +1,57 @@
+"""Production launcher: serve the MCP app from several uvicorn worker processes.
+
+    python app/serve.py --workers 4
+
+Without --workers or MCP_WORKERS, one worker is started per CPU (as with 0).
+Workers share the listening socket and nothing else: each has its own tool
+caches, python_exec sandbox pool, log file and /metrics, /cache/stats and
+/profiles data, so those endpoints report whichever worker answered. Send the supervisor
+SIGHUP for a rolling restart (each replacement is ready before its old worker
+is stopped), SIGTTIN / SIGTTOU to add or remove a worker, and SIGTERM to drain
+in-flight requests for up to --graceful-timeout seconds and exit.
+"""
+import argparse
+import os
+import uvicorn
+from tools.config import config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=config.MCP_HOST)
+    parser.add_argument("--port", type=int, default=config.MCP_PORT)
+    parser.add_argument("--path", default=config.MCP_PATH)
+    # MCP_WORKERS defaults to 1 for the single-process server; the launcher's default is one per CPU.
+    parser.add_argument("--workers", type=int, default=config.MCP_WORKERS if "MCP_WORKERS" in os.environ else 0,
+                        help="worker processes (0, the default without MCP_WORKERS: one per CPU)")
+    parser.add_argument("--stateless", choices=["auto", "true", "false"], default=config.MCP_STATELESS_HTTP)
+    parser.add_argument("--graceful-timeout", type=float, default=config.MCP_GRACEFUL_TIMEOUT)
+    parser.add_argument("--max-requests", type=int, default=config.MCP_MAX_REQUESTS,
+                        help="recycle a worker after this many requests (0 disables)")
+    args = parser.parse_args()
+    args.workers = args.workers or os.cpu_count() or 1
+
+    if args.workers > 1 and args.stateless == "false":
+        parser.error("stateful sessions need session affinity: run single-worker instances on separate "
+                     "ports behind a proxy that routes on the mcp-session-id header (see README)")
+
+    # Workers are spawned fresh and build their app from the environment.
+    os.environ.update({
+        "MCP_PATH": args.path,
+        "MCP_WORKERS": str(args.workers),
+        "MCP_STATELESS_HTTP": args.stateless,
+    })
+    uvicorn.run(
+        "mcp_server_app:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_max_requests=args.max_requests or None,
+        log_level="info",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import codecs
+import io
+from collections import Counter
+from itertools import chain
+
+# Strings longer than this are tokenized a chunk at a time, so at most one
+# chunk's worth of words is ever materialized.
+CHUNK_SIZE = 1 << 16
+# Read size for streamed files and uploads.
+STREAM_CHUNK_SIZE = 1 << 20
+
+
+class WordCounter:
+    """Incremental whitespace word counter for text arriving in chunks.
+
+    Words split across a chunk boundary are counted once, matching
+    ``len(text.split())`` over the concatenated chunks.
+    """
+
+    def __init__(self):
+        self.words = 0
+        self._in_word = False
+
+    def feed(self, chunk: str):
+        if not chunk:
+            return
+        count = len(chunk.split())
+        if count and self._in_word and not chunk[0].isspace():
+            count -= 1  # continues the word the previous chunk ended in
+        self.words += count
+        self._in_word = not chunk[-1].isspace()
+
+
+class TextStats:
+    """Words, lines and bytes of a byte stream, plus optional top-N terms, in one bounded-memory pass.
+
+    Feed raw chunks of any size with :meth:`feed` and call :meth:`finish` at
+    the end. Only one chunk (and the partial word it ends in) is held at a
+    time; input is decoded incrementally as UTF-8, so multi-byte characters
+    split across chunks are handled. Lines are counted like ``wc -l``.
+
+    With ``top_n``, terms are tallied case-insensitively. A word that runs
+    across chunks and grows past ``max_term_chars`` is counted but not
+    carried or tallied, so one huge token can't grow the buffer. Once more than
+    ``max_terms`` distinct terms are seen, the rarest half is pruned, so
+    top-N counts become approximate on very large vocabularies.
+    """
+
+    def __init__(self, top_n: int = 0, max_terms: int = 100_000, max_term_chars: int = 256):
+        self.words = 0
+        self.lines = 0
+        self.bytes = 0
+        self.top_n = top_n
+        self.max_terms = max_terms
+        self.max_term_chars = max_term_chars
+        self._terms = Counter() if top_n > 0 else None
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._carry = ""  # trailing partial word of the previous chunk
+        self._in_long_word = False  # inside a word too long to carry
+
+    def feed(self, data: bytes):
+        self.bytes += len(data)
+        self.lines += data.count(b"\n")
+        self._feed_text(self._decoder.decode(data))
+
+    def _feed_text(self, text: str):
+        if not text:
+            return
+        if self._in_long_word:
+            if not text[0].isspace():
+                rest = text.split(None, 1)
+                if len(rest) == 1 and not text[-1].isspace():
+                    return  # the whole chunk is still inside the word
+                text = rest[1] if len(rest) > 1 else ""
+            self.words += 1
+            self._in_long_word = False
+        buffer = self._carry + text
+        words = buffer.split()
+        self._carry = ""
+        if words and not buffer[-1].isspace():
+            # The last word may continue in the next chunk.
+            self._carry = words.pop()
+            if len(self._carry) > self.max_term_chars:
+                self._carry = ""
+                self._in_long_word = True
+        self.words += len(words)
+        if self._terms is not None:
+            self._terms.update(map(str.lower, words))
+            if len(self._terms) > self.max_terms:
+                self._terms = Counter(dict(self._terms.most_common(self.max_terms // 2)))
+
+    def finish(self) -> dict:
+        """Flush the final partial word and return the stats."""
+        self._feed_text(self._decoder.decode(b"", final=True))
+        if self._carry:
+            self.words += 1
+            if self._terms is not None:
+                self._terms[self._carry.lower()] += 1
+            self._carry = ""
+        if self._in_long_word:
+            self.words += 1
+            self._in_long_word = False
+        stats = {"words": self.words, "lines": self.lines, "bytes": self.bytes}
+        if self._terms is not None:
+            stats["top_terms"] = self._terms.most_common(self.top_n)
+        return stats
+
+
+def count_words(s: str) -> int:
+    if len(s) <= CHUNK_SIZE:
+        return len(s.split())
+    counter = WordCounter()
+    for start in range(0, len(s), CHUNK_SIZE):
+        counter.feed(s[start:start + CHUNK_SIZE])
+    return counter.words
+
+
+def iter_lines(text: str, keepends: bool = False):
+    """Yield the lines of ``text`` one at a time, without building a list of them."""
+    lines = io.StringIO(text, newline=None)
+    if keepends:
+        return iter(lines)
+    return (line[:-1] if line.endswith("\n") else line for line in lines)
+
+
+def batch_items(items, text, keepends: bool = False):
+    """The strings a batch tool processes: ``items``, followed by the lines of ``text``.
+
+    ``keepends`` leaves the trailing newline on each line, which is cheaper
+    when it doesn't matter (e.g. to a whitespace tokenizer).
+    """
+    if text:
+        return chain(items or (), iter_lines(text, keepends))
+    return items or ()
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from urllib.parse import unquote, urlsplit
+from tools.config import config
+from cache import get_cache, normalize_query
+from upstream import get_upstream
+
+logger = logging.getLogger(__name__)
+
+# MediaWiki returns intro extracts for at most 20 pages per request.
+MAX_TITLES_PER_REQUEST = 20
+# Bound on speculative prefetches running at once; more are dropped, not queued.
+MAX_PREWARM_TASKS = 4
+
+# Two-sentence plain-text intros, following redirects; disambiguation pages are flagged so they can be skipped.
+_EXTRACT_PARAMS = {
+    "action": "query",
+    "format": "json",
+    "prop": "extracts|pageprops",
+    "ppprop": "disambiguation",
+    "exintro": "1",
+    "explaintext": "1",
+    "exsentences": "2",
+    "exlimit": "max",
+    "redirects": "1",
+}
+
+_api = urlsplit(config.WIKIPEDIA_API_URL or "https://en.wikipedia.org/w/api.php")
+wikipedia = get_upstream(
+    "wikipedia",
+    f"{_api.scheme}://{_api.netloc}",
+    headers={"User-Agent": "MCP-Server-Client/1.0 (tool backend)"},
+)
+# Article URLs the API above can resolve titles of: its language's desktop and mobile sites.
+_lang = _api.netloc.split(".")[0] if _api.netloc.endswith(".wikipedia.org") else "en"
+_ARTICLE_HOSTS = {f"{_lang}.wikipedia.org", f"{_lang}.m.wikipedia.org"}
+# Search-top-hit intros (wikipedia_summary) and exact-title intros (batch lookups,
+# prewarming) can differ for the same text, so they are cached apart.
+cache = get_cache("wikipedia_summary", ttl=config.WIKIPEDIA_CACHE_TTL)
+title_cache = get_cache("wikipedia_title", ttl=config.WIKIPEDIA_CACHE_TTL)
+_prewarm_tasks = set()
+
+
+async def _query(params: dict) -> dict:
+    response = await wikipedia.request(
+        "GET", _api.path, params={**_EXTRACT_PARAMS, **params}, deadline=config.WIKIPEDIA_TIMEOUT,
+    )
+    return response.json().get("query", {})
+
+
+def _extract(page: dict):
+    if "missing" in page or "disambiguation" in page.get("pageprops", {}):
+        return None
+    return page.get("extract") or None
+
+
+async def search_summary(query: str) -> str:
+    """Intro of the top search hit for ``query``, resolved and fetched in one request."""
+    pages = (await _query({"generator": "search", "gsrsearch": query, "gsrlimit": "1"})).get("pages", {})
+    for page in pages.values():
+        extract = _extract(page)
+        if extract:
+            return extract
+    raise LookupError(f"No Wikipedia article found for '{query}'")
+
+
+async def _title_batch(titles: list) -> dict:
+    result = await _query({"titles": "|".join(titles)})
+    resolved = {title: title for title in titles}
+    # Follow MediaWiki's title normalization, then redirects, back to the requested titles.
+    for step in ("normalized", "redirects"):
+        renames = {item["from"]: item["to"] for item in result.get(step, [])}
+        resolved = {title: renames.get(current, current) for title, current in resolved.items()}
+    extracts = {page["title"]: _extract(page) for page in result.get("pages", {}).values()}
+    return {title: extracts[current] for title, current in resolved.items() if extracts.get(current)}
+
+
+async def title_summaries(titles) -> dict:
+    """Intros of exact article titles, 20 per request; ``{title: extract}`` for the articles that exist."""
+    titles = [title for title in dict.fromkeys(titles) if title.strip() and "|" not in title]
+    batches = [titles[i:i + MAX_TITLES_PER_REQUEST] for i in range(0, len(titles), MAX_TITLES_PER_REQUEST)]
+    found = {}
+    for batch in await asyncio.gather(*(_title_batch(batch) for batch in batches)):
+        found.update(batch)
+    return found
+
+
+def titles_from_urls(urls) -> list:
+    """Article titles of the URLs among ``urls`` that link articles on the API's Wikipedia."""
+    titles = []
+    for url in urls:
+        parts = urlsplit(url or "")
+        if parts.netloc not in _ARTICLE_HOSTS or not parts.path.startswith("/wiki/"):
+            continue
+        title = unquote(parts.path[len("/wiki/"):]).replace("_", " ")
+        if title and ":" not in title:  # skip File:, Special:, ... namespaces
+            titles.append(title)
+    return list(dict.fromkeys(titles))
+
+
+async def _prewarm(titles: list):
+    try:
+        titles = [title for title in titles if not await title_cache.contains(normalize_query(title))]
+        if not titles:
+            return
+        for title, extract in (await title_summaries(titles)).items():
+            await title_cache.put(normalize_query(title), extract)
+        logger.info(f"Prewarmed Wikipedia summaries for {titles}")
+    except Exception as e:
+        logger.debug(f"Wikipedia prewarm failed for {titles}: {e}")
+
+
+def prewarm(urls):
+    """Speculatively cache intros of the Wikipedia articles linked in ``urls``, in the background.
+
+    Best-effort: titles already cached are skipped, and nothing is fetched
+    while ``MAX_PREWARM_TASKS`` prefetches are already running.
+    """
+    titles = titles_from_urls(urls)
+    if not titles or len(_prewarm_tasks) >= MAX_PREWARM_TASKS:
+        return
+    task = asyncio.ensure_future(_prewarm(titles))
+    _prewarm_tasks.add(task)
+    task.add_done_callback(_prewarm_tasks.discard)
@@ -1,5 +1,7 @@
 # No config import needed for add.py
 
+IDEMPOTENT = True
+
 async def run(a: int, b: int) -> int:
     """Add two numbers."""
     return a + b 
\ No newline at end of file
@@ -1,5 +1,7 @@
 # No config import needed for greet.py
 
+IDEMPOTENT = True
+
 async def run(name: str) -> str:
     """Greet a person by name."""
     return f"Hello, {name}!" 
\ No newline at end of file
@@ -1,5 +1,7 @@
 # No config import needed for reverse_string.py
 
+IDEMPOTENT = True
+
 async def run(s: str) -> str:
     """Reverse a string."""
     return s[::-1] 
\ No newline at end of file
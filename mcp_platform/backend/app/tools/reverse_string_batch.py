@@ -0,0 +1,8 @@
+from typing import List, Optional
+from tools._text import batch_items
+
+# Not IDEMPOTENT: keying a large batch for coalescing would cost about as much as reversing it.
+
+def run(items: Optional[List[str]] = None, text: Optional[str] = None) -> List[str]:
+    """Reverse each of many strings, given as a list and/or as newline-delimited text (one result per line)."""
+    return [s[::-1] for s in batch_items(items, text)]
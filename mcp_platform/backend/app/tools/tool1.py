@@ -1,5 +1,7 @@
 # No config import needed for tool1.py
 
-def run(input: dict):
-    question = input.get("question", "")
-    return {"answer": f"Tool1 received: {question}"} 
\ No newline at end of file
+IDEMPOTENT = True
+
+def run(question: str) -> str:
+    """Tool1: answer a question."""
+    return f"Tool1 received: {question}"
\ No newline at end of file
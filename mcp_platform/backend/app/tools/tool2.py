@@ -1,5 +1,7 @@
 # No config import needed for tool2.py
 
-def run(input: dict):
-    question = input.get("question", "")
-    return {"answer": f"Tool2 processed: {question}"} 
\ No newline at end of file
+IDEMPOTENT = True
+
+def run(question: str) -> str:
+    """Tool2: answer a question."""
+    return f"Tool2 processed: {question}"
\ No newline at end of file
@@ -1,9 +1,16 @@
-# No config import needed for wikipedia_summary.py
-import wikipedia
+from cache import normalize_query
+from tools._wikipedia import cache, search_summary
+import progress
+
+IDEMPOTENT = True
+
+async def _summary(query: str) -> str:
+    await progress.report(0, message=f"Looking up '{query}' on Wikipedia")
+    return await search_summary(query)
 
 async def run(query: str) -> str:
     """Get a summary for a topic from Wikipedia."""
     try:
-        return wikipedia.summary(query, sentences=2)
+        return await cache.get_or_call(normalize_query(query), lambda: _summary(query))
     except Exception as e:
-        return f"Error: {e}" 
\ No newline at end of file
+        return f"Error: {e}"
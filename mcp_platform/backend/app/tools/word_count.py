@@ -1,5 +1,7 @@
 # No config import needed for word_count.py
 
+IDEMPOTENT = True
+
 async def run(s: str) -> int:
     """Count the number of words in a string."""
     return len(s.split()) 
\ No newline at end of file
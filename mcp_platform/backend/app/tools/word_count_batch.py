@@ -0,0 +1,9 @@
+from typing import List, Optional
+from tools._text import CHUNK_SIZE, batch_items, count_words
+
+# Not IDEMPOTENT: keying a large batch for coalescing would cost about as much as counting it.
+
+def run(items: Optional[List[str]] = None, text: Optional[str] = None) -> List[int]:
+    """Count the words in each of many strings, given as a list and/or as newline-delimited text."""
+    # Inline split for the common short string; count_words chunks the long ones.
+    return [len(s.split()) if len(s) <= CHUNK_SIZE else count_words(s) for s in batch_items(items, text, keepends=True)]
@@ -0,0 +1,70 @@
+from langchain.agents import AgentExecutor, AgentType, create_tool_calling_agent, initialize_agent
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+# "tool_calling": the model may request several tools in one turn and they run
+# concurrently. "react": the text ReAct loop, one tool per LLM round trip.
+AGENT_MODES = ("tool_calling", "react")
+
+TOOL_CALLING_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a helpful assistant with access to tools. When a question needs several "
+               "independent lookups or calculations, request all of those tool calls at once."),
+    MessagesPlaceholder("chat_history", optional=True),
+    ("human", "{input}"),
+    MessagesPlaceholder("agent_scratchpad"),
+])
+
+
+def build_agent(mode: str, llm, tools: list, memory=None, **executor_kwargs) -> AgentExecutor:
+    """Build the agent executor for ``mode``.
+
+    Pass structured tools for "tool_calling" and single-input text tools for
+    "react". Run tool-calling agents with ``ainvoke``: the async executor
+    gathers all tool calls from one model turn instead of running them in turn.
+    Leave ``memory`` unset for an executor shared between sessions and run it
+    with :func:`ainvoke_with_memory`.
+    """
+    if mode == "react":
+        return initialize_agent(
+            tools,
+            llm,
+            agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+            verbose=True,
+            memory=memory,
+            return_intermediate_steps=True,
+            **executor_kwargs,
+        )
+    agent = create_tool_calling_agent(llm, tools, TOOL_CALLING_PROMPT)
+    return AgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=True,
+        memory=memory,
+        return_intermediate_steps=True,
+        **executor_kwargs,
+    )
+
+
+async def ainvoke_with_memory(agent: AgentExecutor, question: str, memory, callbacks: list = None,
+                              cache=None) -> dict:
+    """Run a shared, memory-less executor with one session's conversation memory.
+
+    With an ``AnswerCache``, a matching earlier answer is returned without
+    running the agent (``result["cached"]`` is then True). The cache is only
+    used for questions asked without prior history, both for lookups and
+    stores, since a follow-up's answer depends on context it doesn't key on.
+    """
+    history = await memory.aload_memory_variables({})
+    standalone = not history.get("chat_history")  # checked now: the memory may return its live list
+    vector = None
+    if cache is not None and standalone:
+        answer, vector = await cache.aget(question)
+        if answer is not None:
+            await memory.asave_context({"input": question}, {"output": answer})
+            return {"output": answer, "intermediate_steps": [], "cached": True}
+    result = await agent.ainvoke({"input": question, **history}, config={"callbacks": callbacks or []})
+    # May summarize older turns with an LLM call when the history exceeds its budget
+    await memory.asave_context({"input": question}, {"output": result["output"]})
+    if cache is not None and standalone and not result["output"].startswith("Agent stopped"):
+        tools_used = {action.tool for action, _ in result.get("intermediate_steps", [])}
+        await cache.aput(question, result["output"], tools_used, vector)
+    return result
@@ -0,0 +1,180 @@
+import asyncio
+from langchain.agents import Tool
+from langchain_core.callbacks import adispatch_custom_event
+from langchain_core.tools import StructuredTool
+from mcp_client import CALL_TIMEOUT_ERRORS, is_session_error
+
+# JSON-schema types -> converters for the agent's plain-text tool input
+_COERCE = {
+    "integer": int,
+    "number": float,
+    "boolean": lambda v: v.strip().lower() in ("true", "1", "yes"),
+}
+
+
+def display_name(tool_name: str) -> str:
+    """`wikipedia_summary_tool` -> `WikipediaSummary`."""
+    if tool_name.endswith("_tool"):
+        tool_name = tool_name[:-len("_tool")]
+    return "".join(part.title() for part in tool_name.split("_"))
+
+
+def parse_tool_input(input_str: str, schema: dict) -> dict:
+    """Map the agent's single text input onto the tool's parameters.
+
+    Single-parameter tools get the text verbatim; multi-parameter tools expect
+    the values separated by spaces, in declaration order.
+    """
+    params = list(schema.get("properties", {}).items())
+    if len(params) == 1:
+        values = [input_str]
+    else:
+        values = input_str.strip().split(maxsplit=len(params) - 1)
+        if len(values) != len(params):
+            names = " ".join(f"<{name}>" for name, _ in params)
+            raise ValueError(f"Input must be {len(params)} values separated by spaces: '{names}'.")
+    return {name: _COERCE.get(prop.get("type"), str)(value) for (name, prop), value in zip(params, values)}
+
+
+def describe(description: str, schema: dict) -> str:
+    params = list(schema.get("properties", {}))
+    if len(params) == 1:
+        return f"{description} Input: the value for '{params[0]}'."
+    return f"{description} Input: values for {', '.join(params)} separated by spaces."
+
+
+def extract_text(result) -> str:
+    content = getattr(result, "content", result)
+    if content and hasattr(content[0], "text"):
+        return content[0].text
+    return str(content[0]) if content else str(content)
+
+
+def error_observation(error: Exception) -> str:
+    """A failed tool call as an ``Error: ...`` observation the agent can act on, as the classic client returns.
+
+    Only errors on a broken session are raised, ending the run.
+    """
+    if is_session_error(error):
+        raise error
+    if isinstance(error, CALL_TIMEOUT_ERRORS):
+        return "Error: the tool call timed out."
+    return f"Error: {getattr(error, 'message', None) or error}"
+
+
+def _schema(mcp_tool) -> dict:
+    return getattr(mcp_tool, "input_schema", None) or mcp_tool.inputSchema
+
+
+def _text_tool_func(pool, name: str, schema: dict, shrink):
+    # A closure rather than default arguments: ReAct renders each func's
+    # signature into its prompt template, where a dict default breaks formatting.
+    def func(input_str: str) -> str:
+        arguments = parse_tool_input(input_str, schema)
+        try:
+            return shrink(extract_text(pool.call_tool(name, arguments)))
+        except Exception as e:
+            return error_observation(e)
+    return func
+
+
+async def _call_with_progress(pool, name: str, arguments: dict):
+    """Call a tool, re-emitting its MCP progress notifications as ``tool_progress`` events.
+
+    Notifications arrive on the pool's loop; they are handed over to this loop
+    and dispatched from the tool's own run, so callbacks (e.g. the Streamlit
+    stream) can show partial results while the call is still in flight.
+    """
+    loop = asyncio.get_running_loop()
+    updates = asyncio.Queue()
+
+    async def on_progress(progress, total, message):
+        loop.call_soon_threadsafe(updates.put_nowait, {"progress": progress, "total": total, "message": message})
+
+    call = asyncio.ensure_future(pool.call_tool_async(name, arguments, progress_handler=on_progress))
+    try:
+        while True:
+            update = asyncio.ensure_future(updates.get())
+            await asyncio.wait({call, update}, return_when=asyncio.FIRST_COMPLETED)
+            if not update.done():
+                update.cancel()
+                break
+            await adispatch_custom_event("tool_progress", {"tool": name, **update.result()})
+        while not updates.empty():
+            await adispatch_custom_event("tool_progress", {"tool": name, **updates.get_nowait()})
+    finally:
+        if not call.done():
+            call.cancel()
+    return call.result()
+
+
+def _structured_tool_funcs(pool, name: str, shrink):
+    def func(**kwargs) -> str:
+        try:
+            return shrink(extract_text(pool.call_tool(name, kwargs)))
+        except Exception as e:
+            return error_observation(e)
+
+    async def coroutine(**kwargs) -> str:
+        try:
+            return shrink(extract_text(await _call_with_progress(pool, name, kwargs)))
+        except Exception as e:
+            return error_observation(e)
+    return func, coroutine
+
+
+def current_tools(catalog: list) -> list:
+    """The catalog without deprecated aliases, which duplicate a current tool."""
+    return [mcp_tool for mcp_tool in catalog if not (getattr(mcp_tool, "meta", None) or {}).get("deprecated")]
+
+
+def build_tools(pool, catalog: list, observations=None) -> list:
+    """Create one LangChain Tool per tool advertised by the MCP server.
+
+    With an ``ObservationStore``, long results are cut to a preview plus a
+    reference the agent can page through with :func:`recall_tool`.
+    """
+    shrink = observations.shrink if observations else str
+    return [
+        Tool(
+            name=display_name(mcp_tool.name),
+            func=_text_tool_func(pool, mcp_tool.name, _schema(mcp_tool), shrink),
+            description=describe(mcp_tool.description or mcp_tool.name, _schema(mcp_tool)),
+        )
+        for mcp_tool in current_tools(catalog)
+    ]
+
+
+def build_structured_tools(pool, catalog: list, observations=None) -> list:
+    """Create one multi-argument StructuredTool per MCP tool, for native tool calling.
+
+    The model fills in the server's JSON schema directly, and the async path
+    lets the agent run several calls from one turn concurrently.
+    """
+    shrink = observations.shrink if observations else str
+    tools = []
+    for mcp_tool in current_tools(catalog):
+        func, coroutine = _structured_tool_funcs(pool, mcp_tool.name, shrink)
+        tools.append(StructuredTool(
+            name=display_name(mcp_tool.name),
+            description=mcp_tool.description or mcp_tool.name,
+            args_schema=_schema(mcp_tool),
+            func=func,
+            coroutine=coroutine,
+        ))
+    return tools
+
+
+def recall_tool(observations, structured: bool = False):
+    """Tool for reading the rest of an observation that ``observations`` truncated."""
+    description = "Read more of a truncated tool result, given the ref and offset it mentions."
+    if structured:
+        return StructuredTool.from_function(
+            func=observations.recall, name="RecallObservation", description=description,
+        )
+
+    def func(input_str: str) -> str:
+        ref, _, offset = input_str.strip().partition(" ")
+        return observations.recall(ref, int(offset or 0))
+    return Tool(name="RecallObservation", func=func,
+                description=f"{description} Input: the ref and offset separated by a space.")
@@ -0,0 +1,121 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+
+def normalize_question(question: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive key for exact matches."""
+    return " ".join(re.sub(r"[^\w\s]", " ", question.lower()).split())
+
+
+class _Entry:
+    __slots__ = ("answer", "expires_at", "tools", "vector")
+
+    def __init__(self, answer: str, expires_at: float, tools: frozenset, vector):
+        self.answer = answer
+        self.expires_at = expires_at
+        self.tools = tools
+        self.vector = vector
+
+
+class AnswerCache:
+    """Cache of final agent answers, matched by normalized text and then by meaning.
+
+    Lookups first try the exact normalized question, then (given an
+    ``embeddings`` model) the nearest stored question by cosine similarity in
+    an in-memory numpy index, accepting it at ``threshold`` or above. Answers
+    that used one of ``volatile_tools`` (e.g. WebSearch) expire after
+    ``volatile_ttl`` instead of ``ttl``; a ``volatile_ttl`` of 0 never caches them.
+    """
+
+    def __init__(self, embeddings=None, threshold: float = 0.92, ttl: float = 3600.0,
+                 volatile_tools=(), volatile_ttl: float = 300.0, max_entries: int = 512):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.volatile_tools = frozenset(volatile_tools)
+        self.volatile_ttl = volatile_ttl
+        self.max_entries = max_entries
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # normalized question -> _Entry
+        self._index = None  # (keys, matrix of unit vectors), rebuilt lazily after changes
+
+    async def _embed(self, question: str):
+        vector = np.asarray(await self.embeddings.aembed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _search(self, vector):
+        if self._index is None:
+            keys = [k for k, e in self._entries.items() if e.vector is not None]
+            matrix = np.stack([self._entries[k].vector for k in keys]) if keys else None
+            self._index = (keys, matrix)
+        keys, matrix = self._index
+        if matrix is None:
+            return None, 0.0
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        return keys[best], float(scores[best])
+
+    def _live(self, key: str):
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at < time.monotonic():
+            del self._entries[key]
+            self._index = None
+            return None
+        return entry
+
+    async def aget(self, question: str):
+        """Return ``(answer or None, vector)``; pass the vector back to :meth:`aput` to avoid re-embedding."""
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._live(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits["exact"] += 1
+                return entry.answer, entry.vector
+        if self.embeddings is None:
+            with self._lock:
+                self.misses += 1
+            return None, None
+        vector = await self._embed(question)
+        with self._lock:
+            match, score = self._search(vector)
+            entry = self._live(match) if match is not None and score >= self.threshold else None
+            if entry is not None:
+                self._entries.move_to_end(match)
+                self.hits["semantic"] += 1
+                return entry.answer, vector
+            self.misses += 1
+        return None, vector
+
+    async def aput(self, question: str, answer: str, tools_used=(), vector=None):
+        tools_used = frozenset(tools_used)
+        ttl = self.volatile_ttl if tools_used & self.volatile_tools else self.ttl
+        if ttl <= 0:
+            return
+        if vector is None and self.embeddings is not None:
+            vector = await self._embed(question)
+        with self._lock:
+            self._entries[normalize_question(question)] = _Entry(answer, time.monotonic() + ttl, tools_used, vector)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._index = None
+
+    def invalidate(self, tool: str = None):
+        """Drop every entry, or only those whose answer used ``tool``."""
+        with self._lock:
+            if tool is None:
+                self._entries.clear()
+            else:
+                for key in [k for k, e in self._entries.items() if tool in e.tools]:
+                    del self._entries[key]
+            self._index = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -7,6 +7,29 @@ load_dotenv()
 class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "YOUR_OPENAI_API_KEY")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    # "tool_calling" (parallel native tool calls) or "react" (one tool per LLM round trip)
+    AGENT_MODE = os.getenv("AGENT_MODE", "tool_calling")
+    # Render tokens and tool steps while the agent runs instead of after it finishes
+    STREAMING = os.getenv("STREAMING", "true").lower() == "true"
+    # Chat history budget: older turns beyond this many tokens are summarized
+    MEMORY_MAX_TOKENS = int(os.getenv("MEMORY_MAX_TOKENS", "2000"))
+    # Tool results longer than this are truncated and kept for RecallObservation
+    OBSERVATION_MAX_CHARS = int(os.getenv("OBSERVATION_MAX_CHARS", "2000"))
+    # Optional cache of final answers for repeated questions
+    ANSWER_CACHE = os.getenv("ANSWER_CACHE", "false").lower() == "true"
+    ANSWER_CACHE_SEMANTIC = os.getenv("ANSWER_CACHE_SEMANTIC", "true").lower() == "true"
+    ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+    ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+    # Answers that used these tools expire sooner (0 = never cached)
+    ANSWER_CACHE_VOLATILE_TOOLS = [t for t in os.getenv("ANSWER_CACHE_VOLATILE_TOOLS", "WebSearch").split(",") if t]
+    ANSWER_CACHE_VOLATILE_TTL = float(os.getenv("ANSWER_CACHE_VOLATILE_TTL", "300"))
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8000/mcp")
+    # Persistent MCP client pool shared by all tool wrappers
+    MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "4"))
+    MCP_CALL_TIMEOUT = float(os.getenv("MCP_CALL_TIMEOUT", "120"))
+    MCP_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_HEALTH_CHECK_INTERVAL", "30"))
 
 config = Config()
 
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+import httpx
+from openai import DEFAULT_CONNECTION_LIMITS, DefaultAsyncHttpxClient
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """Async transport keeping a separate connection pool for each event loop.
+
+    Pooled connections belong to the loop that opened them. The Streamlit app
+    runs every question on a fresh loop (``asyncio.run``) while the LLM and
+    embedding clients are cached across runs, so one shared pool would hand
+    later runs connections of an already closed loop. Pools of closed loops
+    are dropped on the next request. Each Streamlit session runs its loop on
+    its own script thread, so the pool map is guarded by a lock.
+    """
+
+    def __init__(self, **transport_kwargs):
+        self._transport_kwargs = transport_kwargs
+        self._transports = {}  # loop -> httpx.AsyncHTTPTransport
+        self._lock = threading.Lock()
+
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                # A closed loop's connections can't be closed gracefully any more; let them be collected.
+                for closed in [other for other in self._transports if other.is_closed()]:
+                    self._transports.pop(closed, None)
+                transport = self._transports[loop] = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+        return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self):
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+def async_http_client() -> httpx.AsyncClient:
+    """HTTP client for ``http_async_client`` of cached OpenAI chat/embedding models."""
+    return DefaultAsyncHttpxClient(transport=LoopLocalTransport(limits=DEFAULT_CONNECTION_LIMITS))
@@ -0,0 +1,202 @@
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import threading
+import time
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+try:
+    from mcp.shared.exceptions import MCPError
+except ImportError:  # mcp releases before the rename
+    from mcp.shared.exceptions import McpError as MCPError
+from mcp.types import CONNECTION_CLOSED
+
+logger = logging.getLogger(__name__)
+
+# What a pool call raises when it outlives ``call_timeout`` (distinct types before Python 3.11).
+CALL_TIMEOUT_ERRORS = (TimeoutError, asyncio.TimeoutError, concurrent.futures.TimeoutError)
+
+
+def is_session_error(error: Exception) -> bool:
+    """Whether ``error`` means the session is unusable, rather than that one call failed.
+
+    Tool failures and JSON-RPC error replies (unknown tool, invalid arguments)
+    arrive over a healthy session, and a timed-out call only means the tool was
+    slow; anything else is treated as a broken transport.
+    """
+    if isinstance(error, (ToolError,) + CALL_TIMEOUT_ERRORS):
+        return False
+    if isinstance(error, MCPError):
+        return error.code == CONNECTION_CLOSED
+    return True
+
+
+def is_unknown_tool(error: Exception) -> bool:
+    """Whether ``error`` is the server rejecting a tool name, e.g. one renamed since the catalogue was fetched."""
+    return isinstance(error, (ToolError, MCPError)) and "unknown tool" in str(error).lower()
+
+
+class _Session:
+    """One persistent streamable-http MCP session.
+
+    The session is opened and closed by a dedicated holder task so the
+    transport's task group is always entered and exited from the same task,
+    while any other task on the pool loop can issue calls through it.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.client = None
+        self.last_used = 0.0
+        self.connections = 0
+        self._task = None
+        self._closing = None
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None and self._task is not None and not self._task.done()
+
+    async def connect(self):
+        ready = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._task = asyncio.create_task(self._hold(ready))
+        await ready
+        self.connections += 1
+        self.last_used = time.monotonic()
+
+    async def _hold(self, ready):
+        try:
+            async with Client(self.url) as client:
+                self.client = client
+                ready.set_result(None)
+                await self._closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"MCP session to {self.url} dropped: {e}")
+        finally:
+            self.client = None
+
+    async def close(self):
+        if self._task is None:
+            return
+        self._closing.set()
+        try:
+            await self._task
+        except Exception:
+            pass
+        self._task = None
+
+
+class MCPClientPool:
+    """Per-process pool of reusable MCP sessions driven by a background event loop.
+
+    Tool wrappers call :meth:`call_tool` from any thread; the call is scheduled
+    on the pool's loop and reuses an already-initialized session, so each tool
+    step costs a single request round trip instead of a connect + handshake.
+    Sessions idle for longer than ``health_check_interval`` are pinged before
+    reuse and transparently reconnected if the server went away.
+
+    ``catalog_version`` changes whenever a tool catalogue fetched earlier may
+    be stale: a session had to reconnect (the server may have been restarted or
+    redeployed) or the server rejected a tool name. Key cached tools on it.
+    """
+
+    def __init__(self, url: str, size: int = 2, call_timeout: float = 120.0,
+                 health_check_interval: float = 30.0):
+        self.url = url
+        self.size = size
+        self.call_timeout = call_timeout
+        self.health_check_interval = health_check_interval
+        self.catalog_version = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mcp-client-pool", daemon=True)
+        self._thread.start()
+        self._sessions = [_Session(url) for _ in range(size)]
+        self._idle = self._submit(self._make_queue()).result()
+        atexit.register(self.close)
+
+    async def _make_queue(self):
+        idle = asyncio.Queue()
+        for session in self._sessions:
+            idle.put_nowait(session)
+        return idle
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _wait(self, coro):
+        # Cancel on timeout so the abandoned call gives its session back to the pool.
+        future = self._submit(coro)
+        try:
+            return future.result(timeout=self.call_timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    async def _ensure_healthy(self, session: _Session):
+        if session.connected and time.monotonic() - session.last_used > self.health_check_interval:
+            try:
+                await asyncio.wait_for(session.client.ping(), timeout=5)
+            except Exception as e:
+                logger.info(f"MCP session failed health check, reconnecting: {e}")
+                await session.close()
+        if not session.connected:
+            await session.close()
+            await session.connect()
+            if session.connections > 1:
+                self.catalog_version += 1
+
+    async def _with_session(self, fn):
+        session = await self._idle.get()
+        try:
+            await self._ensure_healthy(session)
+            result = await fn(session.client)
+            session.last_used = time.monotonic()
+            return result
+        except Exception as e:
+            if is_unknown_tool(e):
+                self.catalog_version += 1
+            if is_session_error(e):
+                # Drop the session so the next caller reconnects instead of reusing a broken transport.
+                await session.close()
+            raise
+        finally:
+            self._idle.put_nowait(session)
+
+    async def acall_tool(self, name: str, arguments: dict, **kwargs):
+        """Call a tool on a pooled session. Must run on the pool's event loop."""
+        return await self._with_session(lambda client: client.call_tool(name, arguments, **kwargs))
+
+    def call_tool(self, name: str, arguments: dict, **kwargs):
+        """Blocking tool call usable from synchronous code such as LangChain tools."""
+        return self._wait(self.acall_tool(name, arguments, **kwargs))
+
+    async def call_tool_async(self, name: str, arguments: dict, **kwargs):
+        """Awaitable tool call from any event loop.
+
+        The call still runs on the pool's loop, so concurrent callers each get
+        their own pooled session and proceed in parallel.
+        """
+        future = self._submit(self.acall_tool(name, arguments, **kwargs))
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.call_timeout)
+
+    def list_tools(self) -> list:
+        """Blocking fetch of the server's tool catalogue."""
+        return self._wait(self._with_session(lambda client: client.list_tools()))
+
+    def close(self):
+        if not self._loop.is_running():
+            return
+
+        async def _close_all():
+            await asyncio.gather(*(s.close() for s in self._sessions), return_exceptions=True)
+
+        try:
+            self._submit(_close_all()).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Error closing MCP client pool: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
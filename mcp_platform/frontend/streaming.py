@@ -0,0 +1,68 @@
+from langchain_core.callbacks import AsyncCallbackHandler
+
+CURSOR = "▌"
+
+
+class StreamlitAgentStream(AsyncCallbackHandler):
+    """Render LLM tokens, tool calls and observations into a Streamlit container as they happen.
+
+    Async so the callbacks run on the event loop in the script thread, where
+    Streamlit elements can be updated; sync handlers would be dispatched to a
+    worker thread without the script's run context. Tool calls are tracked by
+    run id, so parallel calls from one model turn each get their own status box.
+    """
+
+    def __init__(self, container, max_observation_chars: int = 2000):
+        self.container = container
+        self.max_observation_chars = max_observation_chars
+        self._text = ""
+        self._placeholder = None
+        self._tools = {}  # run_id -> st.status
+
+    async def on_chat_model_start(self, serialized, messages, **kwargs):
+        self._text = ""
+        self._placeholder = None
+
+    async def on_llm_start(self, serialized, prompts, **kwargs):
+        self._text = ""
+        self._placeholder = None
+
+    async def on_llm_new_token(self, token: str, **kwargs):
+        if not token:
+            return  # tool-call chunks carry no text
+        if self._placeholder is None:
+            self._placeholder = self.container.empty()
+        self._text += token
+        self._placeholder.markdown(self._text + CURSOR)
+
+    async def on_llm_end(self, response, **kwargs):
+        if self._placeholder is not None:
+            self._placeholder.markdown(self._text)
+
+    async def on_tool_start(self, serialized, input_str: str, *, run_id, **kwargs):
+        status = self.container.status(f"🛠️ {serialized.get('name', 'tool')}", expanded=False)
+        status.markdown(f"**Input:** `{input_str}`")
+        self._tools[run_id] = status
+
+    async def on_custom_event(self, name: str, data, *, run_id, **kwargs):
+        # Partial results a tool streams while it runs (see agent_tools._call_with_progress)
+        status = self._tools.get(run_id)
+        if name == "tool_progress" and status is not None and data.get("message"):
+            step = f"{data['progress']:g}/{data['total']:g}" if data.get("total") else f"{data['progress']:g}"
+            status.markdown(f"**Progress {step}:** {data['message']}")
+            status.update(expanded=True)
+
+    async def on_tool_end(self, output, *, run_id, **kwargs):
+        status = self._tools.pop(run_id, None)
+        if status is not None:
+            text = str(getattr(output, "content", output))
+            if len(text) > self.max_observation_chars:
+                text = text[:self.max_observation_chars] + " …"
+            status.markdown(f"**Observation:** {text}")
+            status.update(state="complete")
+
+    async def on_tool_error(self, error, *, run_id, **kwargs):
+        status = self._tools.pop(run_id, None)
+        if status is not None:
+            status.markdown(f"**Error:** {error}")
+            status.update(state="error")
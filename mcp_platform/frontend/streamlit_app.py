@@ -1,121 +1,110 @@
-import streamlit as st
 import asyncio
+import streamlit as st
 import os
-from fastmcp import Client
-from langchain.agents import initialize_agent, Tool, AgentType
-from langchain_openai import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain.memory import ConversationSummaryBufferMemory
 from pydantic import SecretStr
 from dotenv import load_dotenv
 from config import config
+from mcp_client import MCPClientPool
+from agent_tools import build_tools, build_structured_tools, recall_tool
+from memory import ObservationStore, build_memory
+from answer_cache import AnswerCache
+from agent import AGENT_MODES, build_agent, ainvoke_with_memory
+from streaming import StreamlitAgentStream
+from llm_clients import async_http_client
 
 load_dotenv()
 
 st.set_page_config(page_title="🤖 MCP Chat (FastMCP)", page_icon="🤖", layout="wide")
 
-MCP_SERVER_URL = st.sidebar.text_input("MCP Server URL", "http://localhost:8000/mcp")
-
-# --- Tool Wrappers ---
-def _extract_text(result):
-    if result and hasattr(result[0], 'text'):
-        return result[0].text
-    return str(result[0]) if result else str(result)
-
-def add_tool(input_str: str) -> str:
-    async def run():
-        a, b = map(int, input_str.strip().split())
-        async with Client(MCP_SERVER_URL) as client:
-            result = await client.call_tool("add_tool", {"a": a, "b": b})
-            return _extract_text(result)
-    return asyncio.run(run())
-
-def reverse_string_tool(text: str) -> str:
-    async def run():
-        async with Client(MCP_SERVER_URL) as client:
-            result = await client.call_tool("reverse_string_tool", {"s": text})
-            return _extract_text(result)
-    return asyncio.run(run())
-
-def word_count_tool(text: str) -> str:
-    async def run():
-        async with Client(MCP_SERVER_URL) as client:
-            result = await client.call_tool("word_count_tool", {"s": text})
-            return _extract_text(result)
-    return asyncio.run(run())
-
-def wikipedia_summary_tool(query: str) -> str:
-    async def run():
-        async with Client(MCP_SERVER_URL) as client:
-            result = await client.call_tool("wikipedia_tool", {"query": query})
-            return _extract_text(result)
-    return asyncio.run(run())
-
-def web_search_tool(query: str) -> str:
-    async def run():
-        async with Client(MCP_SERVER_URL) as client:
-            result = await client.call_tool("web_search_tool", {"query": query})
-            return _extract_text(result)
-    return asyncio.run(run())
-
-def python_exec_tool(code: str) -> str:
-    async def run():
-        async with Client(MCP_SERVER_URL) as client:
-            result = await client.call_tool("python_exec_tool", {"code": code})
-            return _extract_text(result)
-    return asyncio.run(run())
-
-def greet_tool(name: str) -> str:
-    async def run():
-        async with Client(MCP_SERVER_URL) as client:
-            result = await client.call_tool("greet_tool", {"name": name})
-            return _extract_text(result)
-    return asyncio.run(run())
-
-def tool1_tool(question: str) -> str:
-    async def run():
-        async with Client(MCP_SERVER_URL) as client:
-            result = await client.call_tool("tool1_tool", {"question": question})
-            return _extract_text(result)
-    return asyncio.run(run())
-
-def tool2_tool(question: str) -> str:
-    async def run():
-        async with Client(MCP_SERVER_URL) as client:
-            result = await client.call_tool("tool2_tool", {"question": question})
-            return _extract_text(result)
-    return asyncio.run(run())
-
-# --- LangChain Tools ---
-tools = [
-    Tool(name="Add", func=add_tool, description="Add two numbers. Input: '10 20'"),
-    Tool(name="ReverseString", func=reverse_string_tool, description="Reverse a string. Input: the string to reverse."),
-    Tool(name="WordCount", func=word_count_tool, description="Count the number of words in a string. Input: the string."),
-    Tool(name="WikipediaSummary", func=wikipedia_summary_tool, description="Get a summary for a topic from Wikipedia. Input: the topic."),
-    Tool(name="WebSearch", func=web_search_tool, description="Search the web for up-to-date information. Input: the search query."),
-    Tool(name="PythonExec", func=python_exec_tool, description="Execute a Python code snippet and return the output. Input: a valid Python expression."),
-    Tool(name="Greet", func=greet_tool, description="Greet a person by name. Input: the name."),
-    Tool(name="Tool1", func=tool1_tool, description="Tool1: Input should be a question."),
-    Tool(name="Tool2", func=tool2_tool, description="Tool2: Input should be a question."),
-]
-
-def get_llm():
-    return ChatOpenAI(temperature=0, model=config.OPENAI_MODEL, api_key=SecretStr(config.OPENAI_API_KEY))
-
-def get_agent():
-    if "memory" not in st.session_state:
-        st.session_state.memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-    llm = get_llm()
-    return initialize_agent(
-        tools,
-        llm,
-        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-        verbose=True,
-        memory=st.session_state.memory,
-        return_intermediate_steps=True,
+MCP_SERVER_URL = st.sidebar.text_input("MCP Server URL", config.MCP_SERVER_URL)
+AGENT_MODE = st.sidebar.radio("Agent mode", AGENT_MODES, index=AGENT_MODES.index(config.AGENT_MODE),
+                              help="tool_calling runs several tool calls from one model turn in parallel")
+
+# --- Tools ---
+@st.cache_resource
+def get_mcp_pool(url: str) -> MCPClientPool:
+    """One long-lived client pool per server URL, shared across reruns and sessions."""
+    return MCPClientPool(
+        url,
+        size=config.MCP_POOL_SIZE,
+        call_timeout=config.MCP_CALL_TIMEOUT,
+        health_check_interval=config.MCP_HEALTH_CHECK_INTERVAL,
+    )
+
+@st.cache_resource
+def get_observation_store() -> ObservationStore:
+    """Full text of truncated tool results, shared by the cached tools."""
+    return ObservationStore(max_chars=config.OBSERVATION_MAX_CHARS)
+
+# Tools and agents take the pool's catalog_version so they are rebuilt from a
+# fresh catalogue once the server may have changed its tools.
+@st.cache_resource
+def get_tools(url: str, catalog_version: int) -> list:
+    """LangChain tools generated from the server's tool catalogue."""
+    pool = get_mcp_pool(url)
+    observations = get_observation_store()
+    return build_tools(pool, pool.list_tools(), observations) + [recall_tool(observations)]
+
+@st.cache_resource
+def get_structured_tools(url: str, catalog_version: int) -> list:
+    """Multi-argument tools for the native tool-calling agent."""
+    pool = get_mcp_pool(url)
+    observations = get_observation_store()
+    tools = build_structured_tools(pool, pool.list_tools(), observations)
+    return tools + [recall_tool(observations, structured=True)]
+
+catalog_version = get_mcp_pool(MCP_SERVER_URL).catalog_version
+try:
+    tools = (get_tools if AGENT_MODE == "react" else get_structured_tools)(MCP_SERVER_URL, catalog_version)
+except Exception as e:
+    st.sidebar.error(f"Could not load tools from {MCP_SERVER_URL}: {e}")
+    tools = []
+
+# --- Agent ---
+# The LLM client and executor are shared across reruns and sessions; only the
+# conversation memory is per session and is passed in on each run. Each question
+# runs on its own event loop, so async HTTP connections are pooled per loop.
+@st.cache_resource
+def get_llm(model: str, streaming: bool) -> ChatOpenAI:
+    return ChatOpenAI(temperature=0, model=model, api_key=SecretStr(config.OPENAI_API_KEY), streaming=streaming,
+                      http_async_client=async_http_client())
+
+@st.cache_resource
+def get_agent(url: str, mode: str, model: str, streaming: bool, catalog_version: int):
+    agent_tools = (get_tools if mode == "react" else get_structured_tools)(url, catalog_version)
+    return build_agent(
+        mode,
+        get_llm(model, streaming),
+        agent_tools,
         max_iterations=15,
         max_execution_time=120,
     )
 
+@st.cache_resource
+def get_answer_cache(model: str):
+    """Final-answer cache shared by all sessions (per model), or None when disabled."""
+    if not config.ANSWER_CACHE:
+        return None
+    embeddings = OpenAIEmbeddings(
+        model=config.EMBEDDING_MODEL, api_key=SecretStr(config.OPENAI_API_KEY), http_async_client=async_http_client(),
+    ) if config.ANSWER_CACHE_SEMANTIC else None
+    return AnswerCache(
+        embeddings,
+        threshold=config.ANSWER_CACHE_THRESHOLD,
+        ttl=config.ANSWER_CACHE_TTL,
+        volatile_tools=config.ANSWER_CACHE_VOLATILE_TOOLS,
+        volatile_ttl=config.ANSWER_CACHE_VOLATILE_TTL,
+        max_entries=config.ANSWER_CACHE_MAX_ENTRIES,
+    )
+
+def get_memory() -> ConversationSummaryBufferMemory:
+    if "memory" not in st.session_state:
+        # Summaries use a non-streaming client so they never render as agent output
+        st.session_state.memory = build_memory(get_llm(config.OPENAI_MODEL, False), config.MEMORY_MAX_TOKENS)
+    return st.session_state.memory
+
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 if "latest_answer" not in st.session_state:
@@ -137,16 +126,25 @@ with st.sidebar:
         if "memory" in st.session_state:
             del st.session_state.memory
         st.rerun()
+    answer_cache = get_answer_cache(config.OPENAI_MODEL)
+    if answer_cache is not None:
+        st.caption(f"Answer cache: {answer_cache.stats()}")
+        if st.button("♻️ Clear Answer Cache"):
+            answer_cache.invalidate()
 
 for msg in st.session_state.chat_history:
     st.markdown(f"**{msg['role'].title()}:** {msg['content']}")
 
 question = st.text_input("Ask me anything:", key="input")
 if st.button("Send") and question.strip():
-    agent = get_agent()
+    agent = get_agent(MCP_SERVER_URL, AGENT_MODE, config.OPENAI_MODEL, config.STREAMING, catalog_version)
+    # Tokens, tool calls and observations are rendered here while the agent runs
+    callbacks = [StreamlitAgentStream(st.container())] if config.STREAMING else []
     with st.spinner("Thinking..."):
         try:
-            result = agent.invoke({"input": question})
+            # Async so tool calls requested in the same turn are dispatched concurrently
+            result = asyncio.run(ainvoke_with_memory(
+                agent, question, get_memory(), callbacks, cache=get_answer_cache(config.OPENAI_MODEL)))
             answer = result["output"] if isinstance(result, dict) and "output" in result else result
             st.session_state.chat_history.append({"role": "user", "content": question})
             st.session_state.chat_history.append({"role": "agent", "content": answer})
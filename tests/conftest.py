@@ -0,0 +1,27 @@
+"""Shared fixtures. Both backends carry a copy of most modules, and each copy
+imports its own backend's config, so backend tests run as a script in a fresh
+interpreter per backend."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKENDS = ["classic_api", "mcp_platform"]
+
+
+@pytest.fixture(params=BACKENDS)
+def run_in_backend(request, tmp_path):
+    """``run(source, *args, env=None)`` executes ``source`` from the backend's app directory; it must exit 0."""
+    app_dir = os.path.join(ROOT, request.param, "backend", "app")
+
+    def run(source: str, *args, env: dict = None):
+        script = tmp_path / "script.py"
+        script.write_text(source)
+        result = subprocess.run([sys.executable, str(script), *args], cwd=app_dir,
+                                env={**os.environ, "PYTHONPATH": app_dir, **(env or {})},
+                                capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+
+    return run
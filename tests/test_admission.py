@@ -0,0 +1,74 @@
+"""Tests for admission control (both backends carry a copy of admission.py)."""
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_admission(app: str):
+    path = os.path.join(ROOT, app, "backend", "app", "admission.py")
+    spec = importlib.util.spec_from_file_location(f"{app}_admission", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(params=["classic_api", "mcp_platform"])
+def admission(request):
+    return load_admission(request.param)
+
+
+def test_timed_out_waiters_do_not_leak_slots(admission):
+    limiter = admission.ToolLimiter(limit=2, queue_size=4, queue_timeout=0.02)
+    outcomes = []
+
+    async def call(hold: float):
+        try:
+            await limiter.acquire("tool")
+        except admission.Overloaded:
+            outcomes.append("rejected")
+            return
+        try:
+            await asyncio.sleep(hold)
+            outcomes.append("ok")
+        finally:
+            limiter.release()
+
+    async def main():
+        # Two run; the four queued waiters all time out while the holders sleep.
+        await asyncio.gather(*(call(0.1) for _ in range(6)))
+        assert sorted(outcomes) == ["ok", "ok"] + ["rejected"] * 4
+        assert (limiter.running, limiter.waiting) == (0, 0)
+
+        # A waiter's timeout firing in the same loop iteration as a release.
+        await limiter.acquire("tool")
+        await limiter.acquire("tool")
+        waiter = asyncio.ensure_future(limiter.acquire("tool"))
+        await asyncio.sleep(0.03)
+        limiter.release()
+        try:
+            await waiter
+            limiter.release()
+        except admission.Overloaded:
+            pass
+        limiter.release()
+        assert (limiter.running, limiter.waiting) == (0, 0)
+
+        # The full concurrency is still available.
+        outcomes.clear()
+        await asyncio.gather(*(call(0.01) for _ in range(2)))
+        assert outcomes == ["ok", "ok"]
+
+    asyncio.run(main())
+
+
+def test_client_headers_only_trusted_from_proxies(admission):
+    admission.configure({}, trusted_proxies=["10.0.0.0/8"])
+    headers = {"x-client-id": "alice", "x-forwarded-for": "203.0.113.7, 10.1.2.3"}
+    assert admission.client_identity("198.51.100.1", headers) == "198.51.100.1"
+    assert admission.client_identity("10.0.0.1", headers) == "alice"
+    assert admission.client_identity("10.0.0.1", {"x-forwarded-for": "203.0.113.7, 10.1.2.3"}) == "203.0.113.7"
+    assert admission.client_identity("10.0.0.1", {}) == "10.0.0.1"
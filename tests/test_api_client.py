@@ -0,0 +1,73 @@
+"""Tests for the classic frontend's shared HTTP client."""
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "classic_api", "frontend"))
+
+from api_client import ToolAPIClient  # noqa: E402
+
+CATALOGUE = [
+    {"name": "add", "idempotent": True},
+    {"name": "word_count_batch", "idempotent": False},
+    {"name": "web_search", "idempotent": True, "reports_progress": True},
+]
+
+
+@pytest.fixture
+def client():
+    client = ToolAPIClient("http://backend", backoff_factor=0)
+    client.sent = []
+    client.status = None  # reply with this status instead of dropping the connection
+
+    def handler(request):
+        client.sent.append(request.url.path)
+        if request.url.path == "/tools":
+            return httpx.Response(200, json=CATALOGUE)
+        if request.url.path == "/tools/batch/stream":
+            return httpx.Response(200, text='{"index": 0, "tool": "web_search", "answer": "streamed"}\n')
+        if client.status:
+            return httpx.Response(client.status, json={"detail": "gateway"})
+        raise httpx.RemoteProtocolError("server disconnected", request=request)
+
+    client._client = httpx.Client(base_url="http://backend", transport=httpx.MockTransport(handler))
+    client.list_tools()
+    yield client
+    client.close()
+
+
+def test_dropped_connections_are_not_retried_for_non_idempotent_tools(client):
+    with pytest.raises(httpx.RemoteProtocolError):
+        client.call_tool("word_count_batch", {"items": ["a b"]})
+    assert client.sent.count("/tools/word_count_batch") == 1
+
+
+def test_dropped_connections_are_retried_for_idempotent_tools(client):
+    with pytest.raises(httpx.RemoteProtocolError):
+        client.call_tool("add", {"a": 1, "b": 2})
+    assert client.sent.count("/tools/add") == client.retries + 1
+
+
+@pytest.mark.parametrize("status, attempts", [(502, 1), (504, 1), (503, 3)])
+def test_gateway_errors_are_only_retried_when_unsent_for_non_idempotent_tools(client, status, attempts):
+    client.status = status
+    client.call_tool("word_count_batch", {"items": ["a b"]})
+    assert client.sent.count("/tools/word_count_batch") == attempts
+
+
+@pytest.mark.parametrize("status", [502, 503, 504])
+def test_gateway_errors_are_retried_for_idempotent_tools(client, status):
+    client.status = status
+    client.call_tool("add", {"a": 1, "b": 2})
+    assert client.sent.count("/tools/add") == client.retries + 1
+
+
+def test_only_progress_reporting_tools_stream(client):
+    client.status = 200
+    assert asyncio.run(client.acall_tool("web_search", {"query": "q"}, progress_handler=print)) == "streamed"
+    asyncio.run(client.acall_tool("add", {"a": 1, "b": 2}, progress_handler=print))
+    assert client.sent[1:] == ["/tools/batch/stream", "/tools/add"]
@@ -0,0 +1,27 @@
+"""Tests for the tool result cache (both backends carry a copy of cache.py)."""
+
+SQLITE_EVICTION = """
+import sys
+from cache import _MISSING, SQLiteCache
+
+cache = SQLiteCache(sys.argv[1], max_entries=10, evict_every=4)
+for i in range(40):
+    cache.set(f"k{i}", i, ttl=60)
+cache.set("stale", 0, ttl=-1)
+for i in range(3):
+    cache.set(f"late{i}", i, ttl=60)
+rows = cache._conn.execute("SELECT key FROM cache").fetchall()
+assert len(rows) == 10, rows
+assert cache.get("k39") == 39 and cache.get("stale") is _MISSING
+
+# Eviction walks the indexes, not the whole table.
+for sql in ("SELECT key FROM cache WHERE expires_at < 0",
+            "SELECT key FROM cache ORDER BY used_at DESC LIMIT -1 OFFSET 10"):
+    plan = " ".join(row[-1] for row in cache._conn.execute("EXPLAIN QUERY PLAN " + sql))
+    assert "USING" in plan and "INDEX" in plan, plan
+"""
+
+
+
+def test_sqlite_eviction_is_bounded_and_indexed(run_in_backend, tmp_path):
+    run_in_backend(SQLITE_EVICTION, str(tmp_path / "cache.db"))
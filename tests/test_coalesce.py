@@ -0,0 +1,61 @@
+"""Tests for coalescing identical in-flight tool calls (both backends carry a copy of coalesce.py)."""
+
+SHARED_CALL = """
+import asyncio
+import coalesce
+import progress
+import registry
+from registry import ToolSpec
+
+started = asyncio.Event()
+cancelled = []
+
+async def slow(n: int) -> int:
+    started.set()
+    try:
+        await asyncio.sleep(0.1)
+        await progress.report(1, 2, "half")
+        return n
+    except asyncio.CancelledError:
+        cancelled.append(n)
+        raise
+
+async def call(spec, updates=None, **kwargs):
+    if updates is not None:
+        async def reporter(progress_, total, message):
+            updates.append(message)
+        progress.set_reporter(reporter)
+    return await spec.invoke(**kwargs)
+
+async def main():
+    spec = ToolSpec("slow", "slow", "", [("n", int, 1)], int, is_async=True, meta={"IDEMPOTENT": True}, run=slow)
+
+    # Progress reaches every caller sharing the call, not just the first.
+    first, second = [], []
+    leader = asyncio.ensure_future(call(spec, first, n=1))
+    await started.wait()
+    joiner = asyncio.ensure_future(call(spec, second, n=1))
+    assert await asyncio.gather(leader, joiner) == [1, 1]
+    assert coalesce.FLIGHTS["slow"].coalesced == 1
+    assert first == second == ["half"] and not coalesce._FANOUTS
+
+    # The shared call keeps running while any caller waits, and stops once all have gone.
+    started.clear()
+    tasks = [asyncio.ensure_future(call(spec, n=2)) for _ in range(2)]
+    await started.wait()
+    tasks[0].cancel()
+    await asyncio.sleep(0.01)
+    assert not cancelled
+    tasks[1].cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert cancelled == [2] and not coalesce._FANOUTS
+    assert await call(spec, n=2) == 2
+
+registry.use(coalesce.middleware)
+asyncio.run(main())
+"""
+
+
+def test_shared_call_fans_out_progress_and_stops_with_its_callers(run_in_backend):
+    run_in_backend(SHARED_CALL)
@@ -0,0 +1,35 @@
+"""Tests for the MCP server's queued logging pipeline."""
+import atexit
+import importlib.util
+import json
+import logging
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_logging_setup():
+    path = os.path.join(ROOT, "mcp_platform", "backend", "app", "logging_setup.py")
+    spec = importlib.util.spec_from_file_location("mcp_logging_setup", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_json_lines_carry_the_traceback_as_a_field(tmp_path):
+    logging_setup = load_logging_setup()
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    listener = logging_setup.setup_logging(str(tmp_path), "server.log")
+    try:
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logging.getLogger("tools.test").exception("failed for %s", "query")
+    finally:
+        listener.stop()
+        atexit.unregister(listener.stop)
+        root.handlers[:], root.level = handlers, level
+    entry = json.loads((tmp_path / "server.log").read_text().splitlines()[-1])
+    assert entry["message"] == "failed for query"
+    assert "ZeroDivisionError" in entry["exc_info"]
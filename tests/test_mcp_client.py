@@ -0,0 +1,66 @@
+"""Tests for the Streamlit agent's pooled MCP client."""
+import asyncio
+import concurrent.futures
+import importlib.util
+import os
+import sys
+
+import pytest
+from fastmcp.exceptions import ToolError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND = os.path.join(ROOT, "mcp_platform", "frontend")
+sys.path.insert(0, FRONTEND)
+
+from mcp_client import MCPClientPool  # noqa: E402
+
+
+def load_agent_tools():
+    # The classic frontend has an agent_tools module too; load this one under its own name.
+    spec = importlib.util.spec_from_file_location("mcp_agent_tools", os.path.join(FRONTEND, "agent_tools.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class StubClient:
+    async def call_tool(self, name, arguments, **kwargs):
+        if name == "hang":
+            await asyncio.Event().wait()
+        if name == "renamed":
+            raise ToolError("Unknown tool: 'renamed'")
+        return name
+
+
+@pytest.fixture
+def pool():
+    pool = MCPClientPool("http://stub", size=1, call_timeout=0.2)
+
+    async def healthy(session):
+        session.client = StubClient()
+
+    pool._ensure_healthy = healthy
+    yield pool
+    pool.close()
+
+
+def test_timed_out_calls_release_their_session(pool):
+    for _ in range(2):
+        with pytest.raises(concurrent.futures.TimeoutError):
+            pool.call_tool("hang", {})
+    assert pool.call_tool("echo", {}) == "echo"
+
+
+def test_timed_out_calls_become_error_observations(pool):
+    agent_tools = load_agent_tools()
+    func, coroutine = agent_tools._structured_tool_funcs(pool, "hang", str)
+    assert func().startswith("Error:")
+    assert asyncio.run(coroutine()).startswith("Error:")
+
+
+def test_unknown_tools_invalidate_the_catalogue(pool):
+    with pytest.raises(ToolError):
+        pool.call_tool("renamed", {})
+    assert pool.catalog_version == 1
+    pool.call_tool("echo", {})
+    assert pool.catalog_version == 1
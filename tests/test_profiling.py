@@ -0,0 +1,25 @@
+"""Tests for tool-call profiling (both backends carry a copy of profiling.py)."""
+
+SYNC_TOOL_CPROFILE = """
+import asyncio
+import profiling
+import registry
+from registry import discover
+
+async def main():
+    spec = discover(enabled=["word_count_batch"])["word_count_batch"]
+    result = await spec.invoke(items=["word " * 100000])
+    assert result == [100000], result
+    functions = {name for _, _, name in profiling.PSTATS["word_count_batch"].stats}
+    # The tool runs on a worker thread; its own frames must be in the profile.
+    assert "run" in functions and "count_words" in functions, sorted(functions)
+
+if __name__ == "__main__":
+    registry.use(profiling.middleware)
+    asyncio.run(main())
+"""
+
+
+
+def test_cprofile_records_sync_tool_bodies(run_in_backend):
+    run_in_backend(SYNC_TOOL_CPROFILE, env={"PROFILE_MODE": "cprofile", "PROFILE_SAMPLE_RATE": "1"})
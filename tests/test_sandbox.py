@@ -0,0 +1,70 @@
+"""Regression tests for the python_exec sandbox pool (both backends carry a copy)."""
+
+# Spawned sandbox workers re-import the module as ``sandbox``, so the scripts
+# import it by that name.
+CANCELLED_CALL = """
+import asyncio
+from sandbox import SandboxPool
+
+async def main():
+    pool = SandboxPool(size=1, cpu_seconds=10, wall_timeout=10, memory_mb=512,
+                       max_tasks_per_worker=100, result_cache_size=16)
+    try:
+        assert await pool.evaluate("1+1") == "2"
+        task = asyncio.ensure_future(pool.evaluate("sum(range(3*10**7))"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # The cancelled call's late result must not reach the next caller, nor the result memo.
+        assert await pool.evaluate("2+2") == "4"
+        assert await pool.evaluate("2+2") == "4"
+    finally:
+        pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
+"""
+
+MEMO_BOUNDS = """
+import asyncio
+from sandbox import SandboxPool
+
+async def main():
+    pool = SandboxPool(size=1, cpu_seconds=10, wall_timeout=10, memory_mb=512, max_tasks_per_worker=100,
+                       result_cache_size=16, result_max_chars=1000, result_cache_max_chars=2500)
+    try:
+        # Too long to memoize at all.
+        assert await pool.evaluate("'x'*5000") == "x" * 5000
+        assert len(pool._results) == 0
+        # Memoized, but only as many as fit in the total budget.
+        for i in range(5):
+            assert await pool.evaluate(f"'{i}'*900") == str(i) * 900
+        assert len(pool._results) == 2 and pool._results.chars == 1800
+    finally:
+        pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
+"""
+
+
+def _run_in_backend(app: str, source: str, tmp_path):
+    script = tmp_path / "script.py"
+    script.write_text(source)
+    app_dir = os.path.join(ROOT, app, "backend", "app")
+    env = {**os.environ, "PYTHONPATH": app_dir}
+    result = subprocess.run([sys.executable, str(script)], cwd=app_dir, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+
+
+
+def test_cancelled_call_does_not_leak_result(run_in_backend):
+    run_in_backend(CANCELLED_CALL)
+
+
+def test_result_memo_is_bounded_by_size(run_in_backend):
+    run_in_backend(MEMO_BOUNDS)
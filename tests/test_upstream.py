@@ -0,0 +1,32 @@
+"""Tests for the pooled upstream client (both backends carry a copy of upstream.py)."""
+
+SLOW_UPSTREAM = """
+import asyncio
+import time
+import httpx
+from upstream import UpstreamClient
+
+async def slow(request):
+    await asyncio.sleep(3)
+    return httpx.Response(200, json={})
+
+async def main():
+    client = UpstreamClient("stub", "http://stub", read_timeout=10.0)
+    client._client_kwargs["transport"] = httpx.MockTransport(slow)
+    started = time.monotonic()
+    try:
+        await client.request("GET", "/", deadline=0.3)
+    except httpx.TimeoutException:
+        pass
+    else:
+        raise AssertionError("a slow attempt outlived the deadline")
+    assert time.monotonic() - started < 1.0
+    assert client.counts["error"] == 1 and client.breaker.failures == 1
+
+asyncio.run(main())
+"""
+
+
+
+def test_deadline_bounds_a_single_attempt(run_in_backend):
+    run_in_backend(SLOW_UPSTREAM)
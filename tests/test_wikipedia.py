@@ -0,0 +1,22 @@
+"""Tests for the shared Wikipedia helpers (both backends carry a copy of tools/_wikipedia.py)."""
+
+PREWARM_SCOPE = """
+from tools import _wikipedia
+
+urls = [
+    "https://en.wikipedia.org/wiki/Alan_Turing",
+    "https://en.m.wikipedia.org/wiki/Ada_Lovelace",
+    "https://de.wikipedia.org/wiki/Berlin",
+    "https://fr.m.wikipedia.org/wiki/Paris",
+    "https://en.wikipedia.org/wiki/File:Turing.jpg",
+    "https://example.org/wiki/Other",
+]
+# Only articles the (English) API can resolve are prewarmed.
+assert _wikipedia.titles_from_urls(urls) == ["Alan Turing", "Ada Lovelace"], _wikipedia.titles_from_urls(urls)
+# Exact-title intros never answer a search lookup of the same text.
+assert _wikipedia.title_cache.namespace != _wikipedia.cache.namespace
+"""
+
+
+def test_prewarm_only_takes_articles_the_api_resolves(run_in_backend):
+    run_in_backend(PREWARM_SCOPE, env={"WIKIPEDIA_API_URL": ""})